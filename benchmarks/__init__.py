@@ -0,0 +1,8 @@
+"""
+Benchmarks for django-config-models.
+
+These are not tests: they run against an in-memory SQLite database and the local-memory cache,
+using the models of ``mock_apps/example``, and print timings and database round trips so that
+the numbers can be compared across changes. Run them with ``make benchmark``, or one module at a
+time with e.g. ``python -m benchmarks.bench_views``.
+"""
@@ -0,0 +1,72 @@
+"""
+Run every benchmark module: ``python -m benchmarks``.
+
+``--sizes`` sets the history sizes of the hot path benchmarks (e.g. ``--sizes 1000,1000000``).
+``--save results.json`` stores their results as a baseline, which a later run (e.g. of another
+release) compares its results to with ``--compare results.json``.
+"""
+import argparse
+import json
+
+from benchmarks import bench_fields, bench_paths, bench_views
+from benchmarks.utils import print_report, setup_django
+
+BENCHMARK_MODULES = (bench_views, bench_fields)
+
+
+def parse_args():
+    """
+    Parse the command line arguments.
+    """
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Run the config_models benchmarks.')
+    parser.add_argument(
+        '--sizes',
+        type=lambda value: tuple(int(size) for size in value.split(',')),
+        default=bench_paths.DEFAULT_SIZES,
+        help='comma-separated numbers of history rows of the hot path benchmarks',
+    )
+    parser.add_argument('--save', metavar='PATH', help='write the hot path results to this JSON file')
+    parser.add_argument('--compare', metavar='PATH', help='compare the hot path results to this JSON file')
+    return parser.parse_args()
+
+
+def compare(results, path):
+    """
+    Print the ratio of `results` to the baseline results stored in `path`.
+    """
+    with open(path, encoding='utf-8') as baseline_file:
+        baseline = json.load(baseline_file)
+    rows = [
+        (name, f"{baseline[name]:.1f}", f"{duration:.1f}", f"{duration / baseline[name]:.2f}")
+        for name, duration in results.items()
+        if baseline.get(name)
+    ]
+    print_report(f'Compared to {path}', ('case', 'baseline us/call', 'us/call', 'ratio'), rows)
+
+
+def main():
+    """
+    Run the benchmarks of every module against a freshly flushed database.
+    """
+    args = parse_args()
+    setup_django()
+    from django.core.management import call_command  # pylint: disable=import-outside-toplevel
+    from edx_django_utils.cache.utils import TieredCache  # pylint: disable=import-outside-toplevel
+
+    for module in BENCHMARK_MODULES:
+        call_command('flush', interactive=False, verbosity=0)
+        TieredCache.dangerous_clear_all_tiers()
+        module.run()
+
+    call_command('flush', interactive=False, verbosity=0)
+    TieredCache.dangerous_clear_all_tiers()
+    results = bench_paths.run(args.sizes)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as results_file:
+            json.dump(results, results_file, indent=2, sort_keys=True)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
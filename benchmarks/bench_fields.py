@@ -0,0 +1,83 @@
+"""
+Microbenchmark of entry comparisons.
+
+Compares ``fields_equal`` and ``equal_to_current`` with the per-model field plans to the previous
+implementations, which walked ``_meta.get_fields()`` (and, for ``equal_to_current``, DRF's
+``get_field_info``) on every call.
+"""
+from benchmarks.utils import print_report, setup_django, time_per_call
+
+REPEAT = 20000
+
+
+def legacy_fields_equal(current, instance, fields_to_ignore=("id", "change_date", "changed_by")):
+    """ fields_equal before the field plans. """
+    for field in current._meta.get_fields():
+        if not field.many_to_many and field.name not in fields_to_ignore:
+            if getattr(instance, field.name) != getattr(current, field.name):
+                return False
+    return True
+
+
+def legacy_equal_to_current(model, json):
+    """ equal_to_current before the field plans. """
+    from rest_framework.utils import model_meta  # pylint: disable=import-outside-toplevel
+
+    info = model_meta.get_field_info(model)
+    for field_name, relation_info in info.relations.items():
+        if relation_info.to_many and (field_name in json):
+            json.pop(field_name)
+    new_instance = model(**json)
+    current = model.current(*[getattr(new_instance, key) for key in model.KEY_FIELDS])
+    return current.id is not None and legacy_fields_equal(current, new_instance)
+
+
+def run():
+    """
+    Run the benchmarks and print their results.
+    """
+    # pylint: disable=import-outside-toplevel
+    from django.contrib.auth import get_user_model
+    from example.models import ExampleConfig, ExampleKeyedConfig
+
+    user = get_user_model().objects.create_user(username='benchmark')
+    ExampleConfig(string_field='benchmark', int_field=3, changed_by=user).save()
+    ExampleKeyedConfig(left='left', right='right', user=user, string_field='benchmark').save()
+    current = ExampleConfig.current()
+    keyed_current = ExampleKeyedConfig.objects.select_related('user').get()
+    instance = ExampleConfig(string_field='benchmark', int_field=3)
+    keyed_instance = ExampleKeyedConfig(left='left', right='right', user=user, string_field='benchmark')
+    data = {'string_field': 'benchmark', 'int_field': 3}
+
+    cases = (
+        ('fields_equal', lambda: legacy_fields_equal(current, instance), lambda: current.fields_equal(instance)),
+        (
+            'fields_equal (keyed, with foreign key)',
+            lambda: legacy_fields_equal(keyed_current, keyed_instance),
+            lambda: keyed_current.fields_equal(keyed_instance),
+        ),
+        (
+            'equal_to_current (cached current)',
+            lambda: legacy_equal_to_current(ExampleConfig, dict(data)),
+            lambda: ExampleConfig.equal_to_current(dict(data)),
+        ),
+    )
+    rows = []
+    for name, legacy, planned in cases:
+        assert legacy() == planned()
+        legacy_duration = time_per_call(legacy, REPEAT)
+        planned_duration = time_per_call(planned, REPEAT)
+        rows.append((
+            name, f"{legacy_duration:.2f}", f"{planned_duration:.2f}", f"{legacy_duration / planned_duration:.1f}x",
+        ))
+
+    print_report(
+        'Entry comparisons',
+        ('case', 'us/call, get_fields()', 'us/call, field plan', 'speedup'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    setup_django()
+    run()
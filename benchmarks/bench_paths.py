@@ -0,0 +1,140 @@
+"""
+Benchmarks of the read and write hot paths against synthetic configuration histories.
+
+For each history size, ``ExampleConfig`` gets that many rows, and ``ExampleKeyedConfig`` gets
+that many rows spread over one key per ``HISTORY_PER_KEY`` rows. Each case is then timed on the
+SQLite test database and the local memory cache of the test settings.
+"""
+import io
+import json
+
+from benchmarks.utils import print_report, time_per_call
+
+DEFAULT_SIZES = (10 ** 3, 10 ** 4)
+HISTORY_PER_KEY = 10
+INSERT_BATCH_SIZE = 5000
+IMPORTED_ENTRIES = 100
+
+
+def create_history(size, user):
+    """
+    Replace the rows of the example models with synthetic histories of `size` rows.
+
+    Returns: the keys of ExampleKeyedConfig
+    """
+    # pylint: disable=import-outside-toplevel
+    from example.models import ExampleConfig, ExampleKeyedConfig
+
+    ExampleConfig.objects.all().delete()
+    ExampleKeyedConfig.objects.all().delete()
+
+    key_count = max(size // HISTORY_PER_KEY, 1)
+    keys = [(f'left_{index}', f'right_{index % 7}') for index in range(key_count)]
+    for start in range(0, size, INSERT_BATCH_SIZE):
+        stop = min(start + INSERT_BATCH_SIZE, size)
+        ExampleConfig.objects.bulk_create(
+            ExampleConfig(enabled=index % 2 == 0, int_field=index, changed_by=user) for index in range(start, stop)
+        )
+        ExampleKeyedConfig.objects.bulk_create(
+            ExampleKeyedConfig(
+                left=keys[index % key_count][0],
+                right=keys[index % key_count][1],
+                user=user,
+                enabled=True,
+                int_field=index,
+                changed_by=user,
+            )
+            for index in range(start, stop)
+        )
+    return keys
+
+
+def import_stream(generation):
+    """
+    Return a JSON stream of IMPORTED_ENTRIES ExampleDeserializeConfig entries, which differ for each `generation`.
+    """
+    data = [{'name': f'name_{index}', 'int_field': generation} for index in range(IMPORTED_ENTRIES)]
+    return io.BytesIO(json.dumps({'model': 'example.ExampleDeserializeConfig', 'data': data}).encode('utf-8'))
+
+
+def run(sizes=DEFAULT_SIZES):
+    """
+    Run the benchmarks for every history size, print their results and return them.
+
+    Returns: a dict of the mean durations in microseconds, by ``case [size]``
+    """
+    # pylint: disable=import-outside-toplevel
+    from django.contrib.admin.sites import AdminSite
+    from django.contrib.auth import get_user_model
+    from django.test import RequestFactory
+    from edx_django_utils.cache.utils import RequestCache, TieredCache
+    from example.models import ExampleConfig, ExampleKeyedConfig
+    from rest_framework.test import APIRequestFactory
+
+    from config_models.admin import KeyedConfigurationModelAdmin
+    from config_models.utils import deserialize_json
+    from config_models.views import ConfigurationModelCurrentAPIView
+
+    user = get_user_model().objects.create_user(username='benchmark_paths', is_superuser=True, is_staff=True)
+    conf_admin = KeyedConfigurationModelAdmin(ExampleKeyedConfig, AdminSite())
+    current_request = RequestFactory().get('/admin/example/examplekeyedconfig/')
+    history_request = RequestFactory().get('/admin/example/examplekeyedconfig/', {'show_history': '1'})
+    current_request.user = history_request.user = user
+    rest_request = APIRequestFactory().get('/config/ExampleConfig')
+    rest_request.user = user
+    rest_view = ConfigurationModelCurrentAPIView.as_view(model=ExampleConfig)
+
+    results = {}
+    for size in sizes:
+        keys = create_history(size, user)
+        left, right = keys[len(keys) // 2]
+        generations = iter(range(10 ** 9))
+
+        def cold(func):
+            """ Run `func` with empty caches. """
+            def _cold():
+                TieredCache.dangerous_clear_all_tiers()
+                func()
+            return _cold
+
+        def django_cache_only(func):
+            """ Run `func` with an empty request cache. """
+            def _warm():
+                RequestCache.clear_all_namespaces()
+                func()
+            return _warm
+
+        def current():
+            ExampleKeyedConfig.current(left, right, user)
+
+        cases = (
+            ('current(), request cache hit', current, 2000),
+            ('current(), django cache hit', django_cache_only(current), 2000),
+            ('current(), miss', cold(current), 200),
+            ('current(), unkeyed miss', cold(ExampleConfig.current), 200),
+            ('is_enabled(), request cache hit', ExampleConfig.is_enabled, 2000),
+            ('key_values(), miss', cold(ExampleKeyedConfig.key_values), 5),
+            (
+                'current_set(), first 100',
+                lambda: list(ExampleKeyedConfig.objects.current_set().order_by('pk')[:100]),
+                5,
+            ),
+            ('admin changelist, current', lambda: conf_admin.get_changelist_instance(current_request), 5),
+            ('admin changelist, history', lambda: conf_admin.get_changelist_instance(history_request), 5),
+            (
+                f'deserialize_json, {IMPORTED_ENTRIES} entries',
+                lambda: deserialize_json(import_stream(next(generations)), user.username),
+                5,
+            ),
+            ('REST GET, cached', lambda: rest_view(rest_request), 500),
+        )
+        rows = []
+        for name, func, repeat in cases:
+            TieredCache.dangerous_clear_all_tiers()
+            func()  # Warm up, e.g. fill the caches for the cases that hit them.
+            duration = time_per_call(func, repeat)
+            results[f'{name} [{size}]'] = duration
+            rows.append((name, repeat, f"{duration:.1f}"))
+
+        print_report(f'Hot paths, {size} rows of history', ('case', 'calls', 'us/call'), rows)
+    return results
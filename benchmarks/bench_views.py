@@ -0,0 +1,53 @@
+"""
+Benchmarks of the REST views.
+
+Compares GET requests on ConfigurationModelCurrentAPIView with and without the transaction
+that AtomicMixin used to open for every method, counting database round trips per request.
+"""
+from benchmarks.utils import RoundTripCounter, print_report, setup_django, time_per_call
+
+REPEAT = 500
+
+
+def run():
+    """
+    Run the benchmarks and print their results.
+    """
+    # pylint: disable=import-outside-toplevel
+    from django.contrib.auth import get_user_model
+    from django.db import connection, transaction
+    from example.models import ExampleConfig
+    from rest_framework.test import APIRequestFactory
+
+    from config_models.views import ConfigurationModelCurrentAPIView
+
+    user = get_user_model().objects.create_user(username='benchmark', is_superuser=True)
+    ExampleConfig(string_field='benchmark', changed_by=user).save()
+    request = APIRequestFactory().get('/config/ExampleConfig')
+    request.user = user
+
+    view = ConfigurationModelCurrentAPIView.as_view(model=ExampleConfig)
+
+    def always_atomic_view(request):
+        """ What AtomicMixin used to do for every request method. """
+        with transaction.atomic():
+            return view(request)
+
+    rows = []
+    for name, func in (('GET, atomic for every method', always_atomic_view), ('GET, atomic for unsafe methods', view)):
+        counter = RoundTripCounter(connection)
+        with counter.counting():
+            func(request)
+        duration = time_per_call(lambda func=func: func(request), REPEAT)
+        rows.append((name, counter.statements, counter.transaction_calls, counter.total, f"{duration:.1f}"))
+
+    print_report(
+        'ConfigurationModelCurrentAPIView (cached current())',
+        ('case', 'statements', 'transaction calls', 'round trips/request', 'us/request'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    setup_django()
+    run()
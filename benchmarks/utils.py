@@ -0,0 +1,96 @@
+"""
+Helpers shared by the benchmark modules.
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django():
+    """
+    Configure Django with the test settings and create a fresh in-memory test database.
+    """
+    for path in (ROOT, os.path.join(ROOT, 'mock_apps')):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'test_settings')
+
+    import django  # pylint: disable=import-outside-toplevel
+    from django.db import connection  # pylint: disable=import-outside-toplevel
+    from django.test.utils import setup_test_environment  # pylint: disable=import-outside-toplevel
+
+    django.setup()
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+
+class RoundTripCounter:
+    """
+    Counts the database round trips made on a connection: executed statements, plus the
+    autocommit switches, commits and rollbacks that Django issues outside of cursors.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.statements = 0
+        self.transaction_calls = 0
+
+    @property
+    def total(self):
+        """ All round trips counted so far """
+        return self.statements + self.transaction_calls
+
+    def _count_statement(self, execute, sql, params, many, context):
+        self.statements += 1
+        return execute(sql, params, many, context)
+
+    def _counting(self, method):
+        """
+        Return a replacement for the connection `method` that counts its calls.
+        """
+        def _wrapper(*args, **kwargs):
+            self.transaction_calls += 1
+            return method(*args, **kwargs)
+        return _wrapper
+
+    @contextmanager
+    def counting(self):
+        """
+        Count the round trips made inside the block.
+        """
+        originals = {
+            name: getattr(self.connection, name) for name in ('_set_autocommit', '_commit', '_rollback')
+        }
+        for name, method in originals.items():
+            setattr(self.connection, name, self._counting(method))
+        try:
+            with self.connection.execute_wrapper(self._count_statement):
+                yield self
+        finally:
+            for name in originals:
+                delattr(self.connection, name)
+
+
+def time_per_call(func, repeat):
+    """
+    Call `func` `repeat` times, returning the mean duration of a call in microseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def print_report(title, headers, rows):
+    """
+    Print a table of benchmark results.
+    """
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)]
+    print(f"\n{title}")
+    print("  ".join(str(header).ljust(width) for header, width in zip(headers, widths)))
+    print("  ".join("-" * width for width in widths))
+    for row in rows:
+        print("  ".join(str(cell).ljust(width) for cell, width in zip(row, widths)))
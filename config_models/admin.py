@@ -5,27 +5,190 @@ Admin site models for managing :class:`.ConfigurationModel` subclasses.
 
 from django.contrib import admin
 from django.contrib.admin import ListFilter
+from django.contrib.admin.widgets import (AutocompleteSelect,
+                                          AutocompleteSelectMultiple,
+                                          ForeignKeyRawIdWidget,
+                                          ManyToManyRawIdWidget)
+from django.contrib.admin.views.main import ChangeList
 from django.core.cache import InvalidCacheBackendError, caches
 from django.core.files.base import File
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models.functions import Substr
 from django.forms import models
 from django.http import HttpResponseRedirect
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.functional import cached_property
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
+# Kept for backwards compatibility only: the cached values are cleared by ConfigurationModel
+# itself (see config_models.invalidation), in the cache it reads from.
 try:
     cache = caches['configuration']
 except InvalidCacheBackendError:
-    from django.core.cache import cache
+    from django.core.cache import cache  # pylint: disable=unused-import
+
+
+def estimated_row_count(queryset):
+    """
+    Return the row count the database statistics estimate for the table of an unfiltered
+    `queryset`, or None if the queryset is filtered or the database has no such estimate.
+    """
+    if queryset.query.where:
+        return None
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE relname = %s"
+    elif connection.vendor == 'mysql':
+        sql = "SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s"
+    else:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [queryset.model._meta.db_table])
+        row = cursor.fetchone()
+    return int(row[0]) if row and row[0] is not None and row[0] >= 0 else None
+
+
+def is_large_table(queryset, threshold):
+    """
+    Return whether the table of the unfiltered `queryset` holds more than `threshold` rows, without
+    counting every row when the database has no statistics for it.
+    """
+    estimate = estimated_row_count(queryset)
+    if estimate is not None:
+        return estimate > threshold
+    return queryset[:threshold + 1].count() > threshold
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that counts the rows of large unfiltered tables from the database statistics,
+    instead of running ``COUNT(*)`` over the whole table.
+
+    Counts below ``estimate_threshold`` are considered too imprecise, and are recomputed exactly.
+    """
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = estimated_row_count(self.object_list)
+        if estimate is None or estimate < self.estimate_threshold:
+            return super().count
+        return estimate
+
+
+def preview_annotation_name(field_name):
+    """ Name of the annotation holding the start of a large text field in a changelist """
+    return f'{field_name}_preview'
+
+
+class ConfigurationChangeList(ChangeList):
+    """
+    ChangeList for configuration models, which:
+
+    * loads only the start of large text fields (see ``ConfigurationModelAdmin.list_preview_fields``);
+    * sets the ``is_active`` flag of the rows of the displayed page only, when the queryset of a
+      keyed model isn't annotated with it (see ``KeyedConfigurationModelAdmin``).
+    """
+
+    def get_results(self, request):
+        preview_fields = self.model_admin.get_list_preview_fields(request)
+        if preview_fields:
+            # Fetch one extra character, to tell whether the value was truncated.
+            length = self.model_admin.list_preview_length + 1
+            self.queryset = self.queryset.defer(*preview_fields).annotate(**{
+                preview_annotation_name(name): Substr(name, 1, length) for name in preview_fields
+            })
+        super().get_results(request)
+        if self.model.KEY_FIELDS and request.GET.get(ShowHistoryFilter.parameter_name) == '1':
+            self.result_list = self.model.objects.set_active_flags(self.result_list)
 
 
 class ConfigurationModelAdmin(admin.ModelAdmin):
     """
     :class:`~django.contrib.admin.ModelAdmin` for :class:`.ConfigurationModel` subclasses
+
+    Set ``estimated_count = True`` to count the rows of large unfiltered changelists from the
+    database statistics (see ``EstimatedCountPaginator``).
+
+    The changelist only loads and shows the first ``list_preview_length`` characters of the text
+    fields named in ``list_preview_fields``. It is None by default, which shows complete values.
+
+    Foreign key and many-to-many fields whose target table holds more than
+    ``large_relation_threshold`` rows are edited with an autocomplete widget, if the target model
+    is registered on the admin site with ``search_fields``, or else with a raw id widget, instead of
+    a ``<select>`` listing every row. Set it to ``None`` to always use the default widgets.
     """
 
     date_hierarchy = 'change_date'
+    estimated_count = False
+    list_preview_fields = None
+    list_preview_length = 100
+    large_relation_threshold = 1000
+
+    def __init__(self, model, admin_site):
+        super().__init__(model, admin_site)
+        if self.estimated_count:
+            # The full result count is always an exact COUNT(*) over the whole table.
+            self.show_full_result_count = False
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        if self.estimated_count:
+            return EstimatedCountPaginator(queryset, per_page, orphans, allow_empty_first_page)
+        return super().get_paginator(request, queryset, per_page, orphans, allow_empty_first_page)
+
+    def get_list_select_related(self, request):
+        """
+        Join the foreign keys shown in the list, including nullable ones such as ``changed_by``,
+        which a bare ``select_related()`` doesn't follow.
+        """
+        if self.list_select_related is not False:
+            return self.list_select_related
+        list_display = set(self.get_list_display(request))
+        return [
+            field.name
+            for field in self.model._meta.concrete_fields
+            if field.many_to_one and field.name in list_display
+        ] or False
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if 'widget' not in kwargs:
+            widget = self.get_large_relation_widget(db_field, request, kwargs.get('using'))
+            if widget:
+                kwargs['widget'] = widget
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def formfield_for_manytomany(self, db_field, request, **kwargs):
+        if 'widget' not in kwargs:
+            widget = self.get_large_relation_widget(db_field, request, kwargs.get('using'))
+            if widget:
+                kwargs['widget'] = widget
+        return super().formfield_for_manytomany(db_field, request, **kwargs)
+
+    def get_large_relation_widget(self, db_field, request, using=None):
+        """
+        Return the lookup widget to use for `db_field` if its target table is too large to be listed
+        in a ``<select>``, or None if the default widget should be used.
+        """
+        configured_fields = {
+            *self.get_autocomplete_fields(request), *self.raw_id_fields, *self.radio_fields,
+            *self.filter_horizontal, *self.filter_vertical,
+        }
+        if self.large_relation_threshold is None or db_field.name in configured_fields:
+            return None
+        related_model = db_field.remote_field.model
+        related_queryset = related_model._default_manager.using(using).all()  # pylint: disable=protected-access
+        if not is_large_table(related_queryset, self.large_relation_threshold):
+            return None
+
+        related_admin = self.admin_site._registry.get(related_model)  # pylint: disable=protected-access
+        if related_admin is not None and related_admin.search_fields:
+            widget_class = AutocompleteSelectMultiple if db_field.many_to_many else AutocompleteSelect
+            return widget_class(db_field, self.admin_site, using=using)
+        widget_class = ManyToManyRawIdWidget if db_field.many_to_many else ForeignKeyRawIdWidget
+        return widget_class(db_field.remote_field, self.admin_site, using=using)
 
     def get_actions(self, request):
         """
@@ -35,11 +198,49 @@ class ConfigurationModelAdmin(admin.ModelAdmin):
             'revert': (ConfigurationModelAdmin.revert, 'revert', _('Revert to the selected configuration'))
         }
 
+    def get_changelist(self, request, **kwargs):
+        return ConfigurationChangeList
+
     def get_list_display(self, request):
         """
         Get the list display.
         """
-        return self.get_displayable_field_names()
+        return self.with_previews(request, self.get_displayable_field_names())
+
+    def get_list_preview_fields(self, request):
+        """
+        Return the names of the fields whose changelist values are truncated previews.
+        """
+        return list(self.list_preview_fields or ())
+
+    def with_previews(self, request, list_display):
+        """
+        Replace the fields of `list_display` that are shown as previews with columns displaying them.
+        """
+        preview_fields = set(self.get_list_preview_fields(request))
+        return [
+            self._preview_column(name) if name in preview_fields else name
+            for name in list_display
+        ]
+
+    def _preview_column(self, field_name):
+        """
+        Return a changelist column showing the preview annotation of the text field `field_name`.
+        """
+        field = self.model._meta.get_field(field_name)
+        length = self.list_preview_length
+
+        @admin.display(description=field.verbose_name, ordering=field_name)
+        def _preview(obj):
+            annotation = preview_annotation_name(field_name)
+            # Without the annotation, the row didn't come from the changelist queryset, so the full value is loaded.
+            preview = getattr(obj, annotation) if hasattr(obj, annotation) else getattr(obj, field_name)
+            if preview is not None and len(preview) > length:
+                return preview[:length] + '\u2026'
+            return preview
+
+        _preview.__name__ = field_name
+        return _preview
 
     def get_displayable_field_names(self):
         """
@@ -82,18 +283,35 @@ class ConfigurationModelAdmin(admin.ModelAdmin):
     def save_model(self, request, obj, form, change):
         obj.changed_by = request.user
         super().save_model(request, obj, form, change)
-        cache.delete(obj.cache_key_name(*(getattr(obj, key_name) for key_name in obj.KEY_FIELDS)))
-        cache.delete(obj.key_values_cache_key_name())
 
     def revert(self, request, queryset):
         """
-        Admin action to revert a configuration back to the selected value
+        Admin action to revert a configuration back to the selected value.
+
+        Several entries of a keyed model, at most one per key, can be reverted at once: their
+        copies are inserted with a single ``bulk_create`` (see ``ConfigurationModel.bulk_save``),
+        which doesn't send ``pre_save``/``post_save`` signals.
         """
-        if queryset.count() != 1:
-            self.message_user(request, _("Please select a single configuration to revert to."))
+        # Join the foreign keys among the key fields, whose values make up the keys to invalidate.
+        targets = list(queryset.select_related(*[
+            key_name for key_name in self.model.KEY_FIELDS if self.model._meta.get_field(key_name).many_to_one
+        ]))
+        keys = [tuple(getattr(target, key_name) for key_name in self.model.KEY_FIELDS) for target in targets]
+        if len(set(keys)) != len(targets):
+            if not self.model.KEY_FIELDS:
+                self.message_user(request, _("Please select a single configuration to revert to."))
+            else:
+                self.message_user(request, _("Please select at most one configuration per key to revert to."))
             return None
 
-        target = queryset[0]
+        if len(targets) > 1:
+            for target in targets:
+                target.changed_by = request.user
+            self.model.bulk_save(targets)
+            self.message_user(request, _("Reverted {count} configurations.").format(count=len(targets)))
+            return None
+
+        target = targets[0]
         target.id = None
         self.save_model(request, target, None, False)
         self.message_user(request, _("Reverted configuration."))
@@ -159,12 +377,14 @@ class KeyedConfigurationModelAdmin(ConfigurationModelAdmin):
 
     def get_queryset(self, request):
         """
-        Annote the queryset with an 'is_active' property that's true iff that row is the most
-        recently added row for that particular set of KEY_FIELDS values.
-        Filter the queryset to show only is_active rows by default.
+        Filter the queryset to show only the most recently added row for each set of KEY_FIELDS
+        values by default, annotated with an 'is_active' property.
+
+        When showing the history, the rows aren't annotated: annotating every row of a large
+        table is slow, so the changelist only sets 'is_active' on the rows of the displayed page.
         """
         if request.GET.get(ShowHistoryFilter.parameter_name) == '1':
-            queryset = self.model.objects.with_active_flag()
+            queryset = self.model.objects.all()
         else:
             # Show only the most recent row for each key.
             queryset = self.model.objects.current_set()
@@ -175,7 +395,7 @@ class KeyedConfigurationModelAdmin(ConfigurationModelAdmin):
 
     def get_list_display(self, request):
         """ Add a link to each row for creating a new row using the chosen row as a template """
-        return self.get_displayable_field_names() + ['edit_link']
+        return self.with_previews(request, self.get_displayable_field_names()) + ['edit_link']
 
     def add_view(self, request, form_url='', extra_context=None):
         # Prepopulate new configuration entries with the value of the current config, if given:
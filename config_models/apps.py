@@ -11,3 +11,4 @@ class ConfigModelsConfig(AppConfig):
     """
 
     name = 'config_models'
+    default_auto_field = 'django.db.models.AutoField'
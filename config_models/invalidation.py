@@ -0,0 +1,200 @@
+"""
+Invalidation of the cached values of :class:`.ConfigurationModel` subclasses.
+
+Every write path (``ConfigurationModel.save``, ``bulk_save``, the admin, the REST API and the
+``populate_model`` command) goes through ``invalidate``, which clears the request cache right away
+and the django cache with a single ``delete_many``. Inside ``batched_invalidation`` the django cache
+keys of all the writes are collected, and deleted with one ``delete_many`` when the block exits.
+
+The django cache is only updated once the transaction of the writes commits, so that a concurrent
+reader can't put the previous value back in the cache in between. With the
+``CONFIG_MODELS_WRITE_THROUGH`` setting, the new current values are written to the django cache
+at that point instead of being deleted, except for models with an ``EffectiveDateField``, whose new
+entries may not have taken effect yet.
+
+Until the django cache is updated, ``get_cached_response`` ignores its values for these keys, so
+that the process reads its own writes, and ``set_cached_response`` only stores the values read for
+them in the request cache, as the writes may still be rolled back.
+"""
+import copy
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+from edx_django_utils.cache.utils import DEFAULT_REQUEST_CACHE, TieredCache
+
+from config_models import metrics
+
+# Per thread: ``batch``, the pending cache updates of the current batch, by database alias, and
+# ``uncommitted``, the database alias and the on_commit callback each cache key waits for.
+_state = threading.local()
+
+
+def affected_cache_keys(model, instances):
+    """
+    Return the set of cache keys holding values that saving `instances` of `model` makes stale:
+    the current value of each of their keys and, for keyed models, the cached key values.
+    """
+    return set(_cache_updates(model, instances, write_through=False))
+
+
+def _cache_updates(model, instances, write_through):
+    """
+    Return, for each cache key made stale by saving `instances`, a ``(value, timeout)`` pair
+    holding the new value to cache, or None if the key must be deleted.
+    """
+    updates = {}
+    for instance in instances:
+        # pylint: disable=protected-access
+        cache_key = model.current_cache_key(*[getattr(instance, key) for key in model._key_field_attnames()])
+        if write_through and instance.pk is not None and model.effective_date_field() is None:
+            updates[cache_key] = (cacheable_copy(instance), model.cache_timeout)
+        else:
+            updates[cache_key] = (None, None)
+    if model.KEY_FIELDS:
+        updates[model.key_values_cache_key_name()] = (None, None)
+    return updates
+
+
+def cacheable_copy(instance):
+    """
+    Return a copy of `instance` without the related objects it cached, like the entries read by ``current()``.
+    """
+    cached = copy.copy(instance)
+    cached._state = copy.copy(instance._state)  # pylint: disable=protected-access
+    cached._state.fields_cache = {}  # pylint: disable=protected-access
+    cached.__dict__.pop('_prefetched_objects_cache', None)
+    return cached
+
+
+def _uncommitted():
+    if not hasattr(_state, 'uncommitted'):
+        _state.uncommitted = {}
+    return _state.uncommitted
+
+
+def is_pending(cache_key):
+    """
+    Return whether `cache_key` was invalidated, but the django cache isn't updated yet.
+    """
+    batch = getattr(_state, 'batch', None)
+    if batch and any(cache_key in updates for updates in batch.values()):
+        return True
+    if cache_key not in _uncommitted():
+        return False
+    using, callback = _uncommitted()[cache_key]
+    if any(item[1] is callback for item in transaction.get_connection(using).run_on_commit):
+        return True
+    # The (part of the) transaction holding the write was rolled back, so the cached value is still current.
+    del _uncommitted()[cache_key]
+    return False
+
+
+def get_cached_response(cache_key):
+    """
+    Look `cache_key` up in the request cache, then in the django cache unless the key is pending invalidation.
+
+    Returns: a ``(CachedResponse, tier)`` pair, where `tier` names the cache that held the key
+        (``request`` or ``django``), or is None if neither did.
+    """
+    request_response = DEFAULT_REQUEST_CACHE.get_cached_response(cache_key)
+    if not request_response.is_found and is_pending(cache_key):
+        return request_response, None
+    cached_response = TieredCache.get_cached_response(cache_key)
+    if not cached_response.is_found:
+        return cached_response, None
+    return cached_response, ('request' if request_response.is_found else 'django')
+
+
+def set_cached_response(cache_key, value, timeout):
+    """
+    Store `value` under `cache_key` in both cache tiers or, while the key is pending invalidation, only
+    in the request cache: the value was then read after a write whose transaction may still roll back.
+    """
+    if is_pending(cache_key):
+        DEFAULT_REQUEST_CACHE.set(cache_key, value)
+    else:
+        TieredCache.set_all_tiers(cache_key, value, timeout)
+
+
+def invalidate(model, instances):
+    """
+    Clear the cached values made stale by saving `instances` of `model`.
+    """
+    updates = _cache_updates(model, instances, getattr(settings, 'CONFIG_MODELS_WRITE_THROUGH', False))
+    metrics.increment(metrics.INVALIDATION, model, len(updates))
+    for cache_key in updates:
+        DEFAULT_REQUEST_CACHE.delete(cache_key)
+
+    using = router.db_for_write(model)
+    batch = getattr(_state, 'batch', None)
+    if batch is not None:
+        batch[using].update(updates)
+    else:
+        _update_on_commit(updates, using)
+
+
+def _update_on_commit(updates, using):
+    """
+    Apply `updates` to the django cache once the current transaction on `using`, if any, commits.
+    """
+    if not transaction.get_connection(using).in_atomic_block:
+        _update_cache(updates)
+        return
+    callback = partial(_update_cache, updates)
+    uncommitted = _uncommitted()
+    for cache_key in updates:
+        uncommitted[cache_key] = (using, callback)
+    transaction.on_commit(callback, using=using)
+
+
+def _update_cache(updates):
+    """
+    Delete the keys of `updates` without value from the django cache, with a single ``delete_many``,
+    and write the others.
+    """
+    uncommitted = _uncommitted()
+    for cache_key in updates:
+        uncommitted.pop(cache_key, None)
+
+    deleted = [cache_key for cache_key, (value, _) in updates.items() if value is None]
+    if deleted:
+        cache.delete_many(deleted)
+    values_by_timeout = defaultdict(dict)
+    for cache_key, (value, timeout) in updates.items():
+        if value is not None:
+            values_by_timeout[timeout][cache_key] = value
+    for timeout, values in values_by_timeout.items():
+        cache.set_many(values, timeout)
+
+
+@contextmanager
+def batched_invalidation():
+    """
+    Coalesce the django cache deletes of the writes made in the block into one ``delete_many``.
+
+    Nested blocks are merged into the outermost one. If the block raises, its writes may be rolled
+    back, so the keys are only deleted, even with ``CONFIG_MODELS_WRITE_THROUGH``.
+    """
+    if getattr(_state, 'batch', None) is not None:
+        yield
+        return
+
+    _state.batch = defaultdict(dict)
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        batch, _state.batch = _state.batch, None
+        for using, updates in batch.items():
+            if failed:
+                updates = {cache_key: (None, None) for cache_key in updates}
+            if updates:
+                _update_on_commit(updates, using)
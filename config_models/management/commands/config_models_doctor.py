@@ -0,0 +1,207 @@
+"""
+Reports the size, indexes and cache state of ConfigurationModels, to find the ones loading the database and cache.
+"""
+import datetime
+import pickle
+import statistics
+import time
+
+from django.apps import apps
+from django.core.cache import cache as django_cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, models, router
+from django.utils import timezone
+
+from config_models.invalidation import cacheable_copy
+from config_models.models import ConfigurationModel, read_database
+from config_models.utils import get_configuration_model
+
+COLUMNS = (
+    ('model', 'model'),
+    ('rows', 'rows'),
+    ('keys', 'keys'),
+    ('max depth', 'max_depth'),
+    ('median depth', 'median_depth'),
+    ('key index', 'key_index'),
+    ('payload bytes', 'payload_size'),
+    ('current query ms', 'query_ms'),
+    ('cached', 'cached'),
+    ('stale', 'stale'),
+    ('oldest cached change', 'oldest_cached_change'),
+)
+
+
+class Command(BaseCommand):
+    """
+    This command reports, for each ConfigurationModel, figures showing how much it costs to
+    the database and to the cache.
+    """
+    help = """
+    Reports, for every concrete ConfigurationModel (or the given ones), largest tables first:
+
+    * rows: the number of rows
+    * keys: the number of distinct combinations of KEY_FIELDS values
+    * max depth, median depth: the number of rows (the history) per key
+    * key index: whether a database index starts with the KEY_FIELDS columns
+    * payload bytes: the largest pickled size of the values cached by current()
+    * current query ms: the time of the current_set() query (of the current() query for unkeyed models)
+    * cached, stale: how many of the current entries are in the django cache, and how many of those
+      are older than the database
+    * oldest cached change: the time since the oldest of the cached entries was changed (not since it
+      was cached, which the cache doesn't tell)
+
+    Payload sizes and cache states are measured on the --sample most recently changed current entries.
+
+        $ ... config_models_doctor
+        $ ... config_models_doctor --sample 1000 example.ExampleKeyedConfig
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models',
+            metavar='APP_LABEL.MODEL',
+            nargs='*',
+            help='ConfigurationModels to report on, instead of all of them'
+        )
+
+        parser.add_argument(
+            '--sample',
+            metavar='SAMPLE',
+            dest='sample',
+            type=int,
+            default=100,
+            help='number of current entries whose payload size and cache state are measured'
+        )
+
+    def handle(self, *args, **options):
+        if options.get('models'):
+            try:
+                model_classes = [get_configuration_model(label) for label in options['models']]
+            except ValueError as error:
+                raise CommandError(str(error)) from error
+        else:
+            model_classes = configuration_models()
+        sample = options.get('sample') or 100
+
+        reports = sorted(
+            (diagnose(model_class, sample) for model_class in model_classes),
+            key=lambda report: report['rows'],
+            reverse=True,
+        )
+        rows = [[_format(report[key]) for _title, key in COLUMNS] for report in reports]
+        titles = [title for title, _key in COLUMNS]
+        widths = [max(len(cell) for cell in column) for column in zip(titles, *rows)]
+        for line in [titles, *rows]:
+            self.stdout.write('  '.join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip())
+
+
+def configuration_models():
+    """
+    Return every concrete ConfigurationModel subclass, sorted by label.
+    """
+    return sorted(
+        (
+            model_class for model_class in apps.get_models()
+            if issubclass(model_class, ConfigurationModel) and not model_class._meta.proxy
+        ),
+        key=lambda model_class: model_class._meta.label,
+    )
+
+
+def diagnose(model_class, sample=100):
+    """
+    Return a dict of the figures reported by the command for `model_class`, keyed by the names in COLUMNS.
+
+    Figures which do not apply to the model (e.g. the key index of an unkeyed model) are None.
+    """
+    queryset = model_class.objects.read_queryset()
+    report = {'model': model_class._meta.label, 'key_index': None}
+
+    if model_class.KEY_FIELDS:
+        attnames = model_class._key_field_attnames()  # pylint: disable=protected-access
+        depths = list(
+            queryset.order_by().values(*attnames).annotate(depth=models.Count('pk')).values_list('depth', flat=True)
+        )
+        report['key_index'] = has_key_index(model_class)
+        start = time.perf_counter()
+        for _entry in model_class.objects.current_set().order_by().iterator():
+            pass
+        report['query_ms'] = (time.perf_counter() - start) * 1000
+        current_entries = model_class.objects.current_set().order_by('-change_date')
+    else:
+        rows = queryset.count()
+        depths = [rows] if rows else []
+        start = time.perf_counter()
+        effective = queryset.filter(model_class.effective_filter(timezone.now()))
+        current_entries = list(effective.order_by(*model_class.effective_ordering())[:1])
+        report['query_ms'] = (time.perf_counter() - start) * 1000
+
+    report.update(
+        rows=sum(depths),
+        keys=len(depths),
+        max_depth=max(depths, default=None),
+        median_depth=statistics.median(depths) if depths else None,
+    )
+    report.update(_cache_state(model_class, list(current_entries[:sample])))
+    return report
+
+
+def has_key_index(model_class):
+    """
+    Return whether an index (or a unique constraint) of the table of the keyed `model_class` starts
+    with its KEY_FIELDS columns, in any order.
+    """
+    key_columns = {model_class._meta.get_field(key).column for key in model_class.KEY_FIELDS}
+    connection = connections[read_database(model_class) or router.db_for_read(model_class)]
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, model_class._meta.db_table)
+    return any(
+        (constraint['index'] or constraint['unique'])
+        and set(constraint['columns'][:len(key_columns)]) == key_columns
+        for constraint in constraints.values()
+    )
+
+
+def _cache_state(model_class, entries):
+    """
+    Return the payload size and the cache figures of the current `entries` of `model_class`.
+    """
+    attnames = model_class._key_field_attnames()  # pylint: disable=protected-access
+    cache_keys = [
+        model_class.current_cache_key(*[getattr(entry, attname) for attname in attnames]) for entry in entries
+    ]
+    cached_values = django_cache.get_many(cache_keys)
+    payload_sizes = []
+    cached_dates = []
+    stale = 0
+    for cache_key, entry in zip(cache_keys, entries):
+        cached = cached_values.get(cache_key)
+        payload_sizes.append(len(pickle.dumps(cached or cacheable_copy(entry), pickle.HIGHEST_PROTOCOL)))
+        if cached is not None:
+            cached_dates.append(cached.change_date)
+            stale += cached.pk != entry.pk
+    oldest_cached_change = None
+    if cached_dates:
+        oldest = min((date for date in cached_dates if date is not None), default=None)
+        oldest_cached_change = timezone.now() - oldest if oldest is not None else None
+    return {
+        'payload_size': max(payload_sizes, default=None),
+        'cached': f'{len(cached_dates)}/{len(entries)}',
+        'stale': stale if cached_dates else None,
+        'oldest_cached_change': oldest_cached_change,
+    }
+
+
+def _format(value):
+    """
+    Format a figure of the report.
+    """
+    if value is None:
+        return '-'
+    if isinstance(value, bool):
+        return 'yes' if value else 'NO'
+    if isinstance(value, float):
+        return f'{value:.1f}'
+    if isinstance(value, datetime.timedelta):
+        return str(value - datetime.timedelta(microseconds=value.microseconds))
+    return str(value)
@@ -0,0 +1,157 @@
+"""
+Exports ConfigurationModel entries as JSON that ``populate_model`` can import.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import FileField
+from django.utils import timezone
+
+from config_models.utils import get_configuration_model
+
+
+class Command(BaseCommand):
+    """
+    This command streams the current (or, with --history, all) entries of one or more
+    ConfigurationModels, in the format read by ``populate_model``.
+    """
+    help = """
+    Exports ConfigurationModel entries in the JSON format read by populate_model.
+
+    For a single model, the output is a single block:
+
+    { "model": "config_models.ExampleConfigurationModel", "data": [ { ... }, ... ] }
+
+    For several models, it is a manifest of such blocks:
+
+    { "models": [ { "model": ..., "data": [...] }, ... ] }
+
+    With --format ndjson, every entry is written on its own line as a block holding a single entry.
+
+    Rows are read from the database in chunks of --chunk-size, so memory use does not grow
+    with the size of the table.
+
+        $ ... dump_config example.ExampleKeyedConfig -o path/to/file.json
+        $ ... dump_config --history --format ndjson example.ExampleConfig example.ExampleKeyedConfig
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models',
+            metavar='APP_LABEL.MODEL',
+            nargs='+',
+            help='ConfigurationModels to export'
+        )
+
+        parser.add_argument(
+            '--history',
+            dest='history',
+            action='store_true',
+            default=False,
+            help='export every entry instead of only the current ones'
+        )
+
+        parser.add_argument(
+            '--format',
+            dest='format',
+            choices=('json', 'ndjson'),
+            default='json',
+            help='output format'
+        )
+
+        parser.add_argument(
+            '--chunk-size',
+            metavar='CHUNK_SIZE',
+            dest='chunk_size',
+            type=int,
+            default=2000,
+            help='number of rows fetched from the database at a time'
+        )
+
+        parser.add_argument(
+            '-o',
+            '--output',
+            metavar='OUTPUT_FILE',
+            dest='output',
+            default=None,
+            help='file to write the export to, instead of stdout'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            model_classes = [get_configuration_model(label) for label in options['models']]
+        except ValueError as error:
+            raise CommandError(str(error)) from error
+        history = options.get('history', False)
+        chunk_size = options.get('chunk_size') or 2000
+
+        if options.get('output'):
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                self._dump(output.write, model_classes, history, chunk_size, options.get('format', 'json'))
+        else:
+            self._dump(
+                lambda text: self.stdout.write(text, ending=''),
+                model_classes, history, chunk_size, options.get('format', 'json'),
+            )
+
+    def _dump(self, write, model_classes, history, chunk_size, output_format):
+        """
+        Write the export of `model_classes` through the `write` callable, one row at a time.
+        """
+        if output_format == 'ndjson':
+            for model_class in model_classes:
+                label = model_class._meta.label
+                for row in iter_export_rows(model_class, history, chunk_size):
+                    write(_to_json({"model": label, "data": [row]}) + "\n")
+            return
+
+        if len(model_classes) > 1:
+            write('{"models": [\n')
+        for index, model_class in enumerate(model_classes):
+            if index:
+                write(',\n')
+            write('{"model": ' + _to_json(model_class._meta.label) + ', "data": [')
+            for row_index, row in enumerate(iter_export_rows(model_class, history, chunk_size)):
+                write((',\n' if row_index else '\n') + _to_json(row))
+            write('\n]}')
+        write('\n]}\n' if len(model_classes) > 1 else '\n')
+
+
+def _to_json(value):
+    """
+    Encode `value` as compact JSON.
+    """
+    return json.dumps(value, cls=DjangoJSONEncoder, separators=(',', ':'))
+
+
+def iter_export_rows(model_class, history=False, chunk_size=2000):
+    """
+    Yield a dict for each current entry of `model_class` (or each entry, if `history` is set),
+    holding the values ``populate_model`` accepts for it, oldest first.
+
+    Read-only fields such as ``id``, ``change_date`` and ``changed_by`` are left out, foreign
+    keys are exported as primary keys and many-to-many fields as lists of primary keys.
+    """
+    fields = [field for field in model_class._meta.concrete_fields if field.editable and not field.primary_key]
+    many_to_many = [field.name for field in model_class._meta.many_to_many if field.editable]
+
+    if history:
+        queryset = model_class.objects.all()
+    elif model_class.KEY_FIELDS:
+        queryset = model_class.objects.current_set()
+    else:
+        current_id = model_class.objects.filter(
+            model_class.effective_filter(timezone.now())
+        ).order_by(*model_class.effective_ordering()).values_list('pk', flat=True).first()
+        queryset = model_class.objects.filter(pk=current_id)
+    queryset = queryset.order_by('pk').prefetch_related(*many_to_many)
+
+    for instance in queryset.iterator(chunk_size=chunk_size):
+        row = {}
+        for field in fields:
+            value = field.value_from_object(instance)
+            row[field.name] = value.name if isinstance(field, FileField) else value
+        for name in many_to_many:
+            row[name] = [related.pk for related in getattr(instance, name).all()]
+        yield row
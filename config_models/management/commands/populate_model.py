@@ -1,22 +1,27 @@
 """
-Populates a ConfigurationModel by deserializing JSON data contained in a file.
+Populates ConfigurationModels by deserializing JSON data contained in one or more files.
 """
 import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
+from django.apps import apps
 from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
 from django.utils.translation import gettext_lazy as _
 
-from config_models.utils import deserialize_json
+from config_models.parsing import file_digest, load_config_file
+from config_models.utils import deserialize_config_block, is_import_current, record_import
 
 
 class Command(BaseCommand):
     """
-    This command will deserialize the JSON data in the supplied file to populate
-    a ConfigurationModel. Note that this will add new entries to the model, but it
+    This command will deserialize the JSON data in the supplied files to populate
+    ConfigurationModels. Note that this will add new entries to the models, but it
     will not delete any entries (ConfigurationModel entries are read-only).
     """
     help = """
-    Populates a ConfigurationModel by deserializing the supplied JSON.
+    Populates ConfigurationModels by deserializing the supplied JSON.
 
     JSON should be in a file, with the following format:
 
@@ -35,20 +40,41 @@ class Command(BaseCommand):
         ]
     }
 
+    A file may instead be a manifest carrying several such blocks:
+
+    { "models": [ { "model": ..., "data": [...] }, ... ] }
+
+    Several files, or directories containing *.json files, can be imported at once. With
+    --workers greater than 1, the files are parsed in a process pool and the entries of
+    independent models are written concurrently.
+
+    The digest of each imported file is recorded. A file that was already imported is
+    skipped without being parsed, unless one of its models has gained entries since, or
+    --force is given.
+
     A username corresponding to an existing user must be specified to indicate who
     is executing the command.
 
         $ ... populate_model -f path/to/file.json -u username
+        $ ... populate_model -u username --workers 4 path/to/dir other/file.json
     """
 
     def add_arguments(self, parser):
+        parser.add_argument(
+            'paths',
+            metavar='PATH',
+            nargs='*',
+            help='JSON files, or directories of JSON files, to import ConfigurationModel data'
+        )
+
         parser.add_argument(
             '-f',
             '--file',
             metavar='JSON_FILE',
             dest='file',
-            default=False,
-            help='JSON file to import ConfigurationModel data'
+            action='append',
+            default=[],
+            help='JSON file to import ConfigurationModel data (may be repeated)'
         )
 
         parser.add_argument(
@@ -60,18 +86,140 @@ class Command(BaseCommand):
             help='username to specify who is executing the command'
         )
 
+        parser.add_argument(
+            '-w',
+            '--workers',
+            metavar='WORKERS',
+            dest='workers',
+            type=int,
+            default=1,
+            help='number of processes used to parse files, and of threads used to write independent models'
+        )
+
+        parser.add_argument(
+            '--force',
+            dest='force',
+            action='store_true',
+            default=False,
+            help='import files even if they are unchanged since they were last imported'
+        )
+
     def handle(self, *args, **options):
-        if 'file' not in options or not options['file']:
+        json_files = self._collect_files(options)
+        if not json_files:
             raise CommandError(_("A file containing JSON must be specified."))
 
         if 'username' not in options or not options['username']:
             raise CommandError(_("A valid username must be specified."))
 
-        json_file = options['file']
-        if not os.path.exists(json_file):
-            raise CommandError(_("File {0} does not exist").format(json_file))
+        digests = {json_file: file_digest(json_file) for json_file in json_files}
+        if not options.get('force'):
+            for json_file in [json_file for json_file in json_files if is_import_current(digests[json_file])]:
+                self.stdout.write(_("Skipping unchanged file {0}").format(json_file))
+                json_files.remove(json_file)
+
+        for json_file in json_files:
+            self.stdout.write(_("Importing JSON data from file {0}").format(json_file))
+
+        workers = max(options.get('workers') or 1, 1)
+        parsed_files = self._parse_files(json_files, workers)
+        blocks_by_model = OrderedDict()
+        for blocks in parsed_files:
+            for block in blocks:
+                blocks_by_model.setdefault(block["model"], []).append(block)
+
+        created_entries = self._write_blocks(blocks_by_model, options['username'], workers)
+        for json_file, blocks in zip(json_files, parsed_files):
+            record_import(digests[json_file], {block["model"] for block in blocks})
+        self.stdout.write(_("Import complete, {0} new entries created").format(created_entries))
 
-        self.stdout.write(_("Importing JSON data from file {0}").format(json_file))
-        with open(json_file, "rb") as data:
-            created_entries = deserialize_json(data, options['username'])
-            self.stdout.write(_("Import complete, {0} new entries created").format(created_entries))
+    def _collect_files(self, options):
+        """
+        Return the JSON files named by the options, expanding directories to the *.json files they contain.
+        """
+        paths = list(options.get('paths') or [])
+        file_option = options.get('file') or []
+        paths.extend([file_option] if isinstance(file_option, str) else file_option)
+
+        json_files = []
+        for path in paths:
+            if os.path.isdir(path):
+                json_files.extend(
+                    os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith('.json')
+                )
+            elif os.path.exists(path):
+                json_files.append(path)
+            else:
+                raise CommandError(_("File {0} does not exist").format(path))
+        return json_files
+
+    def _parse_files(self, json_files, workers):
+        """
+        Parse every file, returning the list of configuration blocks of each file.
+        """
+        if workers > 1 and len(json_files) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(load_config_file, json_files))
+        return [load_config_file(json_file) for json_file in json_files]
+
+    def _write_blocks(self, blocks_by_model, username, workers):
+        """
+        Write the blocks, running groups of independent models concurrently when workers > 1.
+
+        Returns: the number of created entries
+        """
+        groups = _group_dependent_models(blocks_by_model)
+        if workers == 1 or len(groups) == 1:
+            return sum(_write_group(group, blocks_by_model, username) for group in groups)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_write_group_in_thread, group, blocks_by_model, username) for group in groups
+            ]
+            return sum(future.result() for future in futures)
+
+
+def _group_dependent_models(blocks_by_model):
+    """
+    Partition the model labels so that models related to each other through a foreign key
+    or many-to-many field end up in the same group, preserving the import order.
+    """
+    labels = list(blocks_by_model)
+    models = {label: apps.get_model(label) for label in labels}
+    group_of = {label: {label} for label in labels}
+    for label, model in models.items():
+        for field in model._meta.get_fields():
+            if not field.is_relation or field.related_model is None:
+                continue
+            for other_label, other_model in models.items():
+                if other_model is field.related_model and group_of[other_label] is not group_of[label]:
+                    merged = group_of[label] | group_of[other_label]
+                    for member in merged:
+                        group_of[member] = merged
+
+    groups = []
+    for label in labels:
+        if not any(label in group for group in groups):
+            groups.append([member for member in labels if member in group_of[label]])
+    return groups
+
+
+def _write_group(group, blocks_by_model, username):
+    """
+    Sequentially write every block of the models in `group`.
+    """
+    return sum(
+        deserialize_config_block(block, username)
+        for label in group
+        for block in blocks_by_model[label]
+    )
+
+
+def _write_group_in_thread(group, blocks_by_model, username):
+    """
+    Write a group of models from a worker thread, releasing the thread's database connections afterwards.
+    """
+    try:
+        return _write_group(group, blocks_by_model, username)
+    finally:
+        connections.close_all()
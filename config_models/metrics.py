@@ -0,0 +1,153 @@
+"""
+Metrics of the configuration lookups and of the cache invalidations.
+
+Metrics are sent to the backend named by the ``CONFIG_MODELS_METRICS_BACKEND`` setting, the dotted
+path of a :class:`MetricsBackend` subclass instantiated once per process. Without it, nothing is
+recorded. Every metric is tagged with the ``model`` label, and:
+
+* ``config_models.cache.hit``: lookups served by a cache, tagged with the ``tier`` (``request`` or
+  ``django``) and the ``lookup`` (``current``, ``key_values`` or ``current_configurations``);
+* ``config_models.cache.miss``: lookups that went to the database, tagged with the ``lookup``;
+* ``config_models.db.fallback`` (timing, in seconds): the database queries of these misses;
+* ``config_models.cache.payload_size`` (distribution, in bytes): the pickled size of the cached values;
+* ``config_models.invalidation``: the cache keys invalidated by writes.
+"""
+import pickle
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+CACHE_HIT = 'config_models.cache.hit'
+CACHE_MISS = 'config_models.cache.miss'
+DB_FALLBACK = 'config_models.db.fallback'
+PAYLOAD_SIZE = 'config_models.cache.payload_size'
+INVALIDATION = 'config_models.invalidation'
+
+
+class MetricsBackend:
+    """
+    Base class of the metrics backends, which ignores every metric.
+
+    Subclasses forward the metrics to a monitoring system, e.g. for statsd::
+
+        class StatsdMetricsBackend(MetricsBackend):
+            def increment(self, name, tags, value=1):
+                statsd.increment(name, value, tags=[f'{key}:{value}' for key, value in tags.items()])
+    """
+
+    def increment(self, name, tags, value=1):
+        """
+        Add `value` to the counter `name`.
+        """
+
+    def timing(self, name, tags, seconds):
+        """
+        Record a duration of the timer `name`.
+        """
+
+    def distribution(self, name, tags, value):
+        """
+        Record a value of the distribution `name`.
+        """
+
+
+class InMemoryMetricsBackend(MetricsBackend):
+    """
+    Backend keeping the metrics in memory, for tests.
+    """
+
+    def __init__(self):
+        self.counters = Counter()
+        self.timings = defaultdict(list)
+        self.distributions = defaultdict(list)
+
+    def increment(self, name, tags, value=1):
+        self.counters[(name, tuple(sorted(tags.items())))] += value
+
+    def timing(self, name, tags, seconds):
+        self.timings[(name, tuple(sorted(tags.items())))].append(seconds)
+
+    def distribution(self, name, tags, value):
+        self.distributions[(name, tuple(sorted(tags.items())))].append(value)
+
+    def count(self, name, **tags):
+        """
+        Return the total of the counter `name` over the recorded tag sets including `tags`.
+        """
+        return sum(
+            value for (counter_name, counter_tags), value in self.counters.items()
+            if counter_name == name and set(tags.items()) <= set(counter_tags)
+        )
+
+    def values(self, name, **tags):
+        """
+        Return the timings and distribution values recorded for `name` with tag sets including `tags`.
+        """
+        return [
+            value
+            for recorded in (self.timings, self.distributions)
+            for (recorded_name, recorded_tags), values in recorded.items()
+            if recorded_name == name and set(tags.items()) <= set(recorded_tags)
+            for value in values
+        ]
+
+    def reset(self):
+        """
+        Forget every recorded metric.
+        """
+        self.counters.clear()
+        self.timings.clear()
+        self.distributions.clear()
+
+
+_backend = []
+
+
+def get_metrics_backend():
+    """
+    Return the configured metrics backend, or None if metrics are disabled.
+    """
+    if not _backend:
+        path = getattr(settings, 'CONFIG_MODELS_METRICS_BACKEND', None)
+        _backend.append(import_string(path)() if path else None)
+    return _backend[0]
+
+
+@receiver(setting_changed)
+def _reset_backend(setting, **kwargs):
+    if setting == 'CONFIG_MODELS_METRICS_BACKEND':
+        _backend.clear()
+
+
+def _tags(model, tags):
+    return dict(tags, model=model._meta.label)
+
+
+def increment(name, model, value=1, **tags):
+    """
+    Add `value` to the counter `name` of `model`.
+    """
+    backend = get_metrics_backend()
+    if backend is not None:
+        backend.increment(name, _tags(model, tags), value)
+
+
+def timing(name, model, seconds, **tags):
+    """
+    Record a duration of the timer `name` of `model`.
+    """
+    backend = get_metrics_backend()
+    if backend is not None:
+        backend.timing(name, _tags(model, tags), seconds)
+
+
+def payload_size(model, value, **tags):
+    """
+    Record the pickled size of the `value` cached for `model`. The value is only pickled when metrics are enabled.
+    """
+    backend = get_metrics_backend()
+    if backend is not None:
+        backend.distribution(PAYLOAD_SIZE, _tags(model, tags), len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL)))
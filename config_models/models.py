@@ -3,45 +3,190 @@ Django Model baseclass for database-backed configuration.
 """
 
 
+import hashlib
+import math
+import time
+from functools import cached_property, partial
+from operator import attrgetter
+
 from django.conf import settings
-# The following import exists for backwards compatibility (because a number of
-# library users assume config_models.models.cache is importable), but
+# A number of library users assume config_models.models.cache is importable, but
 # ConfigModels will now ignore the custom 'configuration' cache setting and just
 # use TieredCache, which will make use of a local request cache + the default
-# Django cache.
-from django.core.cache import cache  # pylint: disable=unused-import
-from django.db import models
+# Django cache. The default cache is also used directly for batched lookups.
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models, router, transaction
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import class_prepared
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from edx_django_utils.cache.utils import TieredCache
+from edx_django_utils.cache.utils import DEFAULT_REQUEST_CACHE, TieredCache
 from rest_framework.utils import model_meta
 
+from config_models import metrics
+from config_models.invalidation import (get_cached_response, invalidate,
+                                        is_pending, set_cached_response)
+from config_models.tracing import trace_lookup
+
+
+# Monotonic deadlines, by model label, until which reads of that model go to the primary database.
+_primary_pins = {}
+
+
+def primary_pin_cache_key_name(model):
+    """
+    Return the django cache key of the marker pinning the reads of `model` to the primary database
+    in every process.
+    """
+    return f'configuration/{model._meta.label}/primary_pin'
+
+
+def pin_reads_to_primary(model):
+    """
+    Send reads of the ConfigurationModel `model` to the primary database, instead of the
+    ``CONFIG_MODELS_READ_DATABASE`` replica, for the next ``CONFIG_MODELS_PRIMARY_PIN_SECONDS``
+    seconds, so that this process reads its own writes even if the replica lags behind.
+
+    Once the transaction of the write commits (before its cache invalidation), a marker with the
+    same lifetime is stored in the django cache, so that the other processes, which miss the cache
+    right after the invalidation, read the new entry from the primary too instead of caching the
+    previous one read from a lagging replica.
+    """
+    if not getattr(settings, 'CONFIG_MODELS_READ_DATABASE', None):
+        return
+    pin_seconds = getattr(settings, 'CONFIG_MODELS_PRIMARY_PIN_SECONDS', 5)
+    _primary_pins[model._meta.label] = time.monotonic() + pin_seconds
+    if pin_seconds > 0:
+        transaction.on_commit(
+            partial(cache.set, primary_pin_cache_key_name(model), True, pin_seconds),
+            using=router.db_for_write(model),
+        )
+
+
+def normalize_timestamp(timestamp):
+    """
+    Return `timestamp` as an aware datetime if ``USE_TZ`` is set (naive ones are taken to be in the
+    current time zone), or as a naive one in the current time zone otherwise, like the database expects.
+    """
+    if settings.USE_TZ and timezone.is_naive(timestamp):
+        return timezone.make_aware(timestamp)
+    if not settings.USE_TZ and timezone.is_aware(timestamp):
+        return timezone.make_naive(timestamp)
+    return timestamp
+
+
+def read_database(model):
+    """
+    Return the alias of the database that reads of the ConfigurationModel `model` should use,
+    or None to let the database routers decide.
+    """
+    alias = getattr(settings, 'CONFIG_MODELS_READ_DATABASE', None)
+    if not alias:
+        return alias
+    if _primary_pins.get(model._meta.label, 0) > time.monotonic() or cache.get(primary_pin_cache_key_name(model)):
+        return router.db_for_write(model)
+    return alias
+
+
+class CurrentSetQuerySet(models.QuerySet):
+    """
+    QuerySet returned by ``current_set()``, whose evaluations (including those of the querysets
+    derived from it) are traced as ``current_set`` lookups, since that is when the query runs.
+    """
+
+    def _fetch_all(self):
+        if self._result_cache is not None:
+            super()._fetch_all()
+            return
+        with trace_lookup('current_set', self.model):
+            super()._fetch_all()
+
+    def iterator(self, chunk_size=None):
+        with trace_lookup('current_set', self.model):
+            yield from super().iterator(chunk_size)
+
+    def count(self):
+        with trace_lookup('current_set', self.model):
+            return super().count()
+
+    def exists(self):
+        with trace_lookup('current_set', self.model):
+            return super().exists()
+
 
 class ConfigurationModelManager(models.Manager):
     """
     Query manager for ConfigurationModel
     """
-    def _current_ids_subquery(self):
+    def read_queryset(self):
         """
-        Internal helper method to return an SQL string that will get the IDs of
-        all the current entries (i.e. the most recent entry for each unique set
-        of key values). Only useful if KEY_FIELDS is set.
+        A queryset on the database configured for reads (see ``read_database``).
         """
-        return self.values(*self.model.KEY_FIELDS).annotate(max=models.Max('pk')).values('max')
+        return self.get_queryset().using(read_database(self.model))
 
-    def current_set(self):
+    def _current_ids_subquery(self, queryset=None, as_of=None):
+        """
+        Internal helper method to return an SQL string that will get the IDs of
+        all the current entries (i.e. the most recently effective entry for each unique set
+        of key values), or of the entries current at `as_of`. Only useful if KEY_FIELDS is set.
+        """
+        queryset = self.get_queryset() if queryset is None else queryset
+        if as_of is not None:
+            queryset = queryset.filter(change_date__lte=as_of)
+        queryset = queryset.filter(self.model.effective_filter(as_of or timezone.now()))
+        if self.model.effective_date_field() is None:
+            # Entries take effect when they are saved, so the current one has the highest id.
+            return queryset.values(*self.model.KEY_FIELDS).annotate(max=models.Max('pk')).values('max')
+        latest = queryset.filter(
+            **{key: models.OuterRef(key) for key in self.model.KEY_FIELDS}
+        ).order_by(*self.model.effective_ordering()).values('pk')[:1]
+        return queryset.order_by().annotate(max=models.Subquery(latest)).values('max').distinct()
+
+    def current_set(self, as_of=None):
         """
         A queryset for the active configuration entries only. Only useful if KEY_FIELDS is set.
 
         Active means the means recent entries for each unique combination of keys. It does not
-        necessaryily mean enbled.
+        necessaryily mean enbled. With `as_of`, the entries that were active at that time are returned.
+
+        The queryset is lazy: it is traced when it is evaluated (see ``CurrentSetQuerySet``).
         """
         assert self.model.KEY_FIELDS != (), "Just use model.current() if there are no KEY_FIELDS"
-        return self.get_queryset().filter(
-            pk__in=self._current_ids_subquery()
+        if as_of is not None:
+            as_of = normalize_timestamp(as_of)
+        queryset = self.read_queryset()
+        return CurrentSetQuerySet(self.model, using=read_database(self.model)).filter(
+            pk__in=self._current_ids_subquery(queryset, as_of)
         ).annotate(
             is_active=models.Value(1, output_field=models.IntegerField())
         )
 
+    def set_active_flags(self, instances):
+        """
+        Set an ``is_active`` attribute on each of `instances`, with the meaning of the annotation
+        added by ``with_active_flag()``, and return them as a list.
+
+        Only the current ids for the keys of these instances are queried, so this is much
+        cheaper than ``with_active_flag()`` for a page of a large table.
+        """
+        instances = list(instances)
+        if not instances:
+            return instances
+        if self.model.KEY_FIELDS:
+            attnames = self.model._key_field_attnames()  # pylint: disable=protected-access
+            key_filter = models.Q()
+            for key_values in {tuple(getattr(instance, attname) for attname in attnames) for instance in instances}:
+                key_filter |= models.Q(**dict(zip(attnames, key_values)))
+            active_ids = {
+                row['max'] for row in self._current_ids_subquery(self.get_queryset().filter(key_filter))
+            }
+        else:
+            active_ids = {self.model.current().pk}
+        for instance in instances:
+            instance.is_active = instance.pk in active_ids
+        return instances
+
     def with_active_flag(self):
         """
         A query set where each result is annotated with an 'is_active' field that indicates
@@ -62,6 +207,124 @@ class ConfigurationModelManager(models.Manager):
         )
 
 
+# Fields that fields_equal and equal_to_current don't compare by default.
+DEFAULT_FIELDS_TO_IGNORE = ("id", "change_date", "changed_by")
+
+
+class ContentHashField(models.CharField):
+    """
+    Column storing a digest of the values of the fields that ``ConfigurationModel.fields_equal``
+    compares by default, which is then compared instead of each field. Enable it by adding it to a
+    :class:`.ConfigurationModel` subclass::
+
+        content_hash = ContentHashField()
+    """
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('max_length', 64)
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('default', '')
+        super().__init__(*args, **kwargs)
+
+
+class EffectiveDateField(models.DateTimeField):
+    """
+    Column holding the time an entry takes effect, to schedule configuration changes ahead of time.
+    Entries without one take effect as soon as they are saved. Enable it by adding it to a
+    :class:`.ConfigurationModel` subclass::
+
+        effective_date = EffectiveDateField()
+
+    ``current()`` then returns the most recent entry that has taken effect, and caches it until
+    the next scheduled entry of its keys takes effect, at most.
+    """
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('null', True)
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('verbose_name', _("Effective date"))
+        super().__init__(*args, **kwargs)
+
+
+def _values_getter(attnames):
+    """
+    Return a function returning the tuple of the values of the `attnames` attributes of an instance.
+    """
+    if not attnames:
+        return lambda instance: ()
+    if len(attnames) == 1:
+        getter = attrgetter(attnames[0])
+        return lambda instance: (getter(instance),)
+    return attrgetter(*attnames)
+
+
+class FieldPlan:
+    """
+    The fields of a ConfigurationModel subclass that ``fields_equal``, ``equal_to_current`` and the
+    content hash work on, computed once per model (see ``field_plan``).
+
+    Fields are compared by attribute name, so that foreign keys are compared by id, without
+    loading the related objects.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._compared_values = {}
+        # The fields of the table, i.e. forward fields other than many-to-many ones.
+        fields = tuple(model._meta.concrete_fields)
+        self.content_hash_field = next((field for field in fields if isinstance(field, ContentHashField)), None)
+        self.effective_date_field = next((field for field in fields if isinstance(field, EffectiveDateField)), None)
+        # The content hash is derived from the other fields, and is still empty on unsaved instances.
+        self.compared_fields = tuple(field for field in fields if field is not self.content_hash_field)
+        self.hashed_fields = tuple(
+            field for field in self.compared_fields if field.name not in DEFAULT_FIELDS_TO_IGNORE
+        )
+        self.compared_values(DEFAULT_FIELDS_TO_IGNORE)
+
+    def compared_values(self, fields_to_ignore):
+        """
+        Return a function returning the tuple of the values compared by ``fields_equal`` when ignoring
+        `fields_to_ignore`.
+        """
+        ignored = frozenset(fields_to_ignore)
+        if ignored not in self._compared_values:
+            self._compared_values[ignored] = _values_getter(
+                [field.attname for field in self.compared_fields if field.name not in ignored]
+            )
+        return self._compared_values[ignored]
+
+    @cached_property
+    def to_many_names(self):
+        """
+        The names of the to-many relations (forward and reverse), which ``equal_to_current`` drops.
+
+        Reverse relations are only known once every model is loaded, hence the lazy evaluation.
+        """
+        info = model_meta.get_field_info(self.model)
+        return frozenset(name for name, relation_info in info.relations.items() if relation_info.to_many)
+
+
+_field_plans = {}
+
+
+def _prepare_field_plan(sender, **kwargs):
+    """
+    Build the field plan of each concrete ConfigurationModel subclass as soon as the class is prepared.
+    """
+    if issubclass(sender, ConfigurationModel) and not sender._meta.abstract:
+        _field_plans[sender] = FieldPlan(sender)
+
+
+def field_plan(model):
+    """
+    Return the ``FieldPlan`` of the ConfigurationModel subclass `model`.
+    """
+    try:
+        return _field_plans[model]
+    except KeyError:
+        plan = _field_plans[model] = FieldPlan(model)
+        return plan
+
+
 class ConfigurationModel(models.Model):
     """
     Abstract base class for model-based configuration
@@ -94,21 +357,154 @@ class ConfigurationModel(models.Model):
     enabled = models.BooleanField(default=False, verbose_name=_("Enabled"))
 
     def save(self, force_insert=False, force_update=False, using=None,
-             update_fields=None):
+             update_fields=None, skip_unchanged=False):
         """
         Clear the cached value when saving a new configuration entry
+
+        With `skip_unchanged`, nothing is written (and this instance is left without ``pk``) when the
+        entry equals the current one for its keys, as compared by ``fields_equal``.
         """
+        if skip_unchanged:
+            current = type(self).current(*[getattr(self, key) for key in self.KEY_FIELDS])
+            if current.pk is not None and current._equals_current(self):  # pylint: disable=protected-access
+                self.pk = None
+                return
+
         # Always create a new entry, instead of updating an existing model
         self.pk = None
+        self._set_content_hash()
         super().save(
             force_insert,
             force_update,
             using,
             update_fields
         )
-        TieredCache.delete_all_tiers(self.cache_key_name(*[getattr(self, key) for key in self.KEY_FIELDS]))
-        if self.KEY_FIELDS:
-            TieredCache.delete_all_tiers(self.key_values_cache_key_name())
+        pin_reads_to_primary(type(self))
+        self.invalidate_cache([self])
+
+    @classmethod
+    def bulk_save(cls, instances):
+        """
+        Insert several new configuration entries with a single ``bulk_create`` in one transaction,
+        then clear the cached values of all the affected keys at once.
+
+        Unlike ``save()``, this doesn't send ``pre_save``/``post_save`` signals. On databases that
+        don't return the ids of bulk inserted rows (e.g. MySQL), the rows are inserted one at a time
+        with ``save_base`` instead (which does send them), still in one transaction, so that every
+        instance gets its ``pk``.
+
+        Nothing is written, invalidated or pinned when there are no instances.
+
+        Returns: the list of created instances
+        """
+        instances = list(instances)
+        if not instances:
+            return instances
+        for instance in instances:
+            instance.pk = None
+            instance._set_content_hash()  # pylint: disable=protected-access
+        using = router.db_for_write(cls)
+        with transaction.atomic(using=using):
+            if connections[using].features.can_return_rows_from_bulk_insert:
+                created = cls.objects.using(using).bulk_create(instances)
+            else:
+                created = instances
+                for instance in created:
+                    instance.save_base(using=using, force_insert=True)
+        pin_reads_to_primary(cls)
+        cls.invalidate_cache(created)
+        return created
+
+    @classmethod
+    def content_hash_field(cls):
+        """
+        Return the ``ContentHashField`` of the model, or None if it has none.
+        """
+        return field_plan(cls).content_hash_field
+
+    @classmethod
+    def effective_date_field(cls):
+        """
+        Return the ``EffectiveDateField`` of the model, or None if it has none.
+        """
+        return field_plan(cls).effective_date_field
+
+    @classmethod
+    def effective_filter(cls, when):
+        """
+        Return a ``Q`` object selecting the entries that have taken effect at `when`.
+        """
+        field = cls.effective_date_field()
+        if field is None:
+            return models.Q()
+        return models.Q(**{f'{field.name}__isnull': True}) | models.Q(**{f'{field.name}__lte': when})
+
+    @classmethod
+    def effective_ordering(cls):
+        """
+        Return the ``order_by()`` arguments sorting entries from the most recently effective one.
+
+        An entry takes effect when it is saved or, if later, at its ``EffectiveDateField`` date, so
+        a scheduled entry supersedes the entries saved before it takes effect. Ties go to the
+        most recently saved entry.
+        """
+        field = cls.effective_date_field()
+        if field is None:
+            return ('-change_date', '-pk')
+        return (Greatest('change_date', Coalesce(field.name, 'change_date')).desc(), '-pk')
+
+    @classmethod
+    def cache_timeout_at(cls, queryset, now):
+        """
+        Return the timeout of the current entries read at `now` among the entries of `queryset`:
+        ``cache_timeout``, shortened so that they expire when the next entry of `queryset`
+        scheduled after `now` takes effect.
+        """
+        field = cls.effective_date_field()
+        if field is None:
+            return cls.cache_timeout
+        next_date = queryset.filter(**{f'{field.name}__gt': now}).aggregate(next=models.Min(field.name))['next']
+        if next_date is None:
+            return cls.cache_timeout
+        seconds = max(math.ceil((next_date - now).total_seconds()), 1)
+        return seconds if cls.cache_timeout is None else min(cls.cache_timeout, seconds)
+
+    def compute_content_hash(self):
+        """
+        Return the SHA-256 hex digest of the values of the fields compared by default by ``fields_equal``.
+        """
+        values = [field.get_prep_value(field.value_from_object(self)) for field in field_plan(type(self)).hashed_fields]
+        return hashlib.sha256(DjangoJSONEncoder(sort_keys=True).encode(values).encode('utf-8')).hexdigest()
+
+    def _set_content_hash(self):
+        """
+        Store the content hash of the entry, if the model has a ``ContentHashField``.
+        """
+        field = self.content_hash_field()
+        if field is not None:
+            setattr(self, field.attname, self.compute_content_hash())
+
+    def _equals_current(self, instance):
+        """
+        Return whether `instance` equals this entry, just read by ``current()``, as compared by
+        ``fields_equal`` with the default fields to ignore.
+
+        The content hash stored in this entry is used, if any: it was read from the database with
+        the entry. The hash of `instance`, which may have been changed since it was read, is computed.
+        """
+        field = self.content_hash_field()
+        stored = getattr(self, field.attname) if field is not None and self.pk is not None else None
+        if stored:
+            return stored == instance.compute_content_hash()
+        return self.fields_equal(instance)
+
+    @classmethod
+    def invalidate_cache(cls, instances):
+        """
+        Clear the cached current values for the keys of `instances`, and the cached key values,
+        with a single ``delete_many`` on the django cache (see ``config_models.invalidation``).
+        """
+        invalidate(cls, instances)
 
     @classmethod
     def cache_key_name(cls, *args):
@@ -122,6 +518,23 @@ class ConfigurationModel(models.Model):
         else:
             return f'configuration/{cls.__name__}/current'
 
+    @classmethod
+    def current_cache_key(cls, *args):
+        """
+        Return the name of the key caching the current entry for the KEY_FIELDS values `args`.
+
+        The values are converted to the ones stored in the KEY_FIELDS columns first (e.g. the id of
+        a related instance), so that a lookup passing instances, ids or strings, and the invalidation
+        of a saved entry, all use the same key.
+        """
+        if not cls.KEY_FIELDS:
+            return cls.cache_key_name(*args)
+        if len(args) != len(cls.KEY_FIELDS):
+            raise TypeError(
+                f"cache_key_name() takes exactly {len(cls.KEY_FIELDS)} arguments ({len(args)} given)"
+            )
+        return cls.cache_key_name(*cls._key_lookup_values(args))
+
     @classmethod
     def current(cls, *args):
         """
@@ -129,19 +542,149 @@ class ConfigurationModel(models.Model):
         from the database, or by creating a new empty entry (which is not
         persisted).
         """
-        cache_key = cls.cache_key_name(*args)
-        cached_response = TieredCache.get_cached_response(cache_key)
-        if cached_response.is_found and cached_response.value is not None:
-            return cached_response.value
+        with trace_lookup('current', cls, args) as lookup:
+            cache_key = cls.current_cache_key(*args)
+            cached_response, lookup.tier = get_cached_response(cache_key)
+            if cached_response.is_found and cached_response.value is not None:
+                metrics.increment(metrics.CACHE_HIT, cls, tier=lookup.tier, lookup='current')
+                return cached_response.value
+
+            metrics.increment(metrics.CACHE_MISS, cls, lookup='current')
+            start = time.perf_counter()
+            key_dict = dict(zip(cls.KEY_FIELDS, args))
+            now = timezone.now()
+            queryset = cls.objects.read_queryset().filter(**key_dict)
+            try:
+                current = queryset.filter(cls.effective_filter(now)).order_by(*cls.effective_ordering())[0]
+            except IndexError:
+                current = cls(**key_dict)
+            timeout = cls.cache_timeout_at(queryset, now)
+            metrics.timing(metrics.DB_FALLBACK, cls, time.perf_counter() - start, lookup='current')
+
+            set_cached_response(cache_key, current, timeout)
+            metrics.payload_size(cls, current, lookup='current')
+            return current
 
-        key_dict = dict(zip(cls.KEY_FIELDS, args))
-        try:
-            current = cls.objects.filter(**key_dict).order_by('-change_date')[0]
-        except IndexError:
-            current = cls(**key_dict)
+    @classmethod
+    def entry_cache_key_name(cls, entry_id):
+        """Return the name of the key to use to cache the entry with the id `entry_id`"""
+        return f'configuration/{cls.__name__}/entry/{entry_id}'
+
+    @classmethod
+    def as_of(cls, timestamp, *args):
+        """
+        Return the configuration entry that was active at `timestamp`, i.e. the most recent one
+        changed at or before it, or a new empty entry (which is not persisted) if there was none.
+
+        Only the id of that entry is queried (using the index on the KEY_FIELDS and ``change_date``):
+        entries never change once saved, so they are cached by id, without expiry, and the cache
+        holds at most one value per entry whatever the number of timestamps looked up.
+        """
+        if len(args) != len(cls.KEY_FIELDS):
+            raise TypeError(f"as_of() takes exactly {len(cls.KEY_FIELDS) + 1} arguments ({len(args) + 1} given)")
+        timestamp = normalize_timestamp(timestamp)
+        with trace_lookup('as_of', cls, args) as lookup:
+            key_dict = dict(zip(cls.KEY_FIELDS, args))
+            queryset = cls.objects.read_queryset()
+            entry_id = queryset.filter(
+                cls.effective_filter(timestamp), change_date__lte=timestamp, **key_dict
+            ).order_by(*cls.effective_ordering()).values_list('pk', flat=True).first()
+            if entry_id is None:
+                return cls(**key_dict)
+
+            cache_key = cls.entry_cache_key_name(entry_id)
+            cached_response, lookup.tier = get_cached_response(cache_key)
+            if cached_response.is_found:
+                metrics.increment(metrics.CACHE_HIT, cls, tier=lookup.tier, lookup='as_of')
+                return cached_response.value
+
+            metrics.increment(metrics.CACHE_MISS, cls, lookup='as_of')
+            start = time.perf_counter()
+            entry = queryset.get(pk=entry_id)
+            metrics.timing(metrics.DB_FALLBACK, cls, time.perf_counter() - start, lookup='as_of')
+            if is_pending(cls.current_cache_key(*[getattr(entry, key) for key in cls._key_field_attnames()])):
+                # The entry may have been written by the current transaction, which can still roll back.
+                DEFAULT_REQUEST_CACHE.set(cache_key, entry)
+            else:
+                TieredCache.set_all_tiers(cache_key, entry, None)
+            metrics.payload_size(cls, entry, lookup='as_of')
+            return entry
+
+    @classmethod
+    def current_from_db_many(cls, key_tuples):
+        """
+        Return the active configuration entry for each tuple of KEY_FIELDS values in `key_tuples`,
+        in the same order, reading them from the database with a single query. Entries that don't
+        exist yet are returned as new, unsaved instances, like ``current()`` does.
+
+        This bypasses the cache; see ``current_many`` for a cached version.
+        """
+        if not key_tuples:
+            return []
+        if not cls.KEY_FIELDS:
+            try:
+                current = cls.objects.read_queryset().filter(
+                    cls.effective_filter(timezone.now())
+                ).order_by(*cls.effective_ordering())[0]
+            except IndexError:
+                current = cls()
+            return [current for _args in key_tuples]
+
+        lookups = [cls._key_lookup_values(args) for args in key_tuples]
+        queryset = cls.objects.read_queryset()
+        # pylint: disable=protected-access
+        current_ids = cls.objects._current_ids_subquery(cls.keys_queryset(key_tuples))
+        rows = {
+            tuple(getattr(row, attname) for attname in cls._key_field_attnames()): row
+            for row in queryset.filter(pk__in=current_ids)
+        }
+        return [
+            rows.get(lookup) or cls(**dict(zip(cls._key_field_attnames(), lookup)))
+            for lookup in lookups
+        ]
 
-        TieredCache.set_all_tiers(cache_key, current, cls.cache_timeout)
-        return current
+    @classmethod
+    def keys_queryset(cls, key_tuples):
+        """
+        Return a queryset of the entries of the tuples of KEY_FIELDS values in `key_tuples`, on the
+        database configured for reads.
+        """
+        queryset = cls.objects.read_queryset()
+        if not cls.KEY_FIELDS:
+            return queryset
+        key_filter = models.Q()
+        for lookup in dict.fromkeys(cls._key_lookup_values(args) for args in key_tuples):
+            key_filter |= models.Q(**dict(zip(cls._key_field_attnames(), lookup)))
+        return queryset.filter(key_filter)
+
+    @classmethod
+    def current_many(cls, key_tuples):
+        """
+        Return the active configuration entry for each tuple of KEY_FIELDS values in `key_tuples`,
+        in the same order. See ``current_configurations``.
+        """
+        return current_configurations([(cls, key_tuples)])[0]
+
+    @classmethod
+    def _key_field_attnames(cls):
+        """ The column attribute names of the KEY_FIELDS (e.g. ``user_id`` for ``user``) """
+        return tuple(cls._meta.get_field(key).attname for key in cls.KEY_FIELDS)
+
+    @classmethod
+    def _key_lookup_values(cls, args):
+        """
+        Convert a tuple of KEY_FIELDS values, which may hold model instances or strings, into
+        the values stored in the KEY_FIELDS columns.
+        """
+        if len(args) != len(cls.KEY_FIELDS):
+            raise TypeError(f"Expected {len(cls.KEY_FIELDS)} key values ({len(args)} given)")
+        values = []
+        for key, arg in zip(cls.KEY_FIELDS, args):
+            field = cls._meta.get_field(key)
+            if isinstance(arg, models.Model):
+                arg = arg.pk
+            values.append(field.target_field.to_python(arg) if field.is_relation else field.to_python(arg))
+        return tuple(values)
 
     @classmethod
     def is_enabled(cls, *key_fields):
@@ -186,22 +729,31 @@ class ConfigurationModel(models.Model):
         flat = kwargs.pop('flat', False)
         assert not kwargs, "'flat' is the only kwarg accepted"
         key_fields = key_fields or cls.KEY_FIELDS
-        cache_key = cls.key_values_cache_key_name(*key_fields)
-        cached_response = TieredCache.get_cached_response(cache_key)
-        if cached_response.is_found:
-            return cached_response.value
-
-        values = list(cls.objects.values_list(*key_fields, flat=flat).order_by().distinct())
-        TieredCache.set_all_tiers(cache_key, values, cls.cache_timeout)
-        return values
-
-    def fields_equal(self, instance, fields_to_ignore=("id", "change_date", "changed_by")):
+        with trace_lookup('key_values', cls, key_fields) as lookup:
+            cache_key = cls.key_values_cache_key_name(*key_fields)
+            cached_response, lookup.tier = get_cached_response(cache_key)
+            if cached_response.is_found:
+                metrics.increment(metrics.CACHE_HIT, cls, tier=lookup.tier, lookup='key_values')
+                return cached_response.value
+
+            metrics.increment(metrics.CACHE_MISS, cls, lookup='key_values')
+            start = time.perf_counter()
+            values = list(cls.objects.read_queryset().values_list(*key_fields, flat=flat).order_by().distinct())
+            metrics.timing(metrics.DB_FALLBACK, cls, time.perf_counter() - start, lookup='key_values')
+            set_cached_response(cache_key, values, cls.cache_timeout)
+            metrics.payload_size(cls, values, lookup='key_values')
+            return values
+
+    def fields_equal(self, instance, fields_to_ignore=DEFAULT_FIELDS_TO_IGNORE):
         """
         Compares this instance's fields to the supplied instance to test for equality.
         This will ignore any fields in `fields_to_ignore`.
 
         Note that this method ignores many-to-many fields.
 
+        If the model has a ``ContentHashField`` and the default `fields_to_ignore` are used, the
+        content hashes of both instances are computed and compared instead.
+
         Args:
             instance: the model instance to compare
             fields_to_ignore: List of fields that should not be compared for equality. By default
@@ -209,15 +761,15 @@ class ConfigurationModel(models.Model):
 
         Returns: True if the checked fields are all equivalent, else False
         """
-        for field in self._meta.get_fields():
-            if not field.many_to_many and field.name not in fields_to_ignore:
-                if getattr(instance, field.name) != getattr(self, field.name):
-                    return False
+        plan = field_plan(type(self))
+        if plan.content_hash_field is not None and set(fields_to_ignore) == set(DEFAULT_FIELDS_TO_IGNORE):
+            return self.compute_content_hash() == instance.compute_content_hash()
 
-        return True
+        compared_values = plan.compared_values(fields_to_ignore)
+        return compared_values(self) == compared_values(instance)
 
     @classmethod
-    def equal_to_current(cls, json, fields_to_ignore=("id", "change_date", "changed_by")):
+    def equal_to_current(cls, json, fields_to_ignore=DEFAULT_FIELDS_TO_IGNORE):
         """
         Compares for equality this instance to a model instance constructed from the supplied JSON.
         This will ignore any fields in `fields_to_ignore`.
@@ -236,16 +788,101 @@ class ConfigurationModel(models.Model):
 
         # Remove many-to-many relationships from json.
         # They require an instance to be already saved.
-        info = model_meta.get_field_info(cls)
-        for field_name, relation_info in info.relations.items():
-            if relation_info.to_many and (field_name in json):
-                json.pop(field_name)
+        for field_name in field_plan(cls).to_many_names.intersection(json):
+            json.pop(field_name)
 
         new_instance = cls(**json)
         key_field_args = tuple(getattr(new_instance, key) for key in cls.KEY_FIELDS)
         current = cls.current(*key_field_args)
         # If current.id is None, no entry actually existed and the "current" method created it.
         if current.id is not None:
+            if set(fields_to_ignore) == set(DEFAULT_FIELDS_TO_IGNORE):
+                return current._equals_current(new_instance)  # pylint: disable=protected-access
             return current.fields_equal(new_instance, fields_to_ignore)
 
         return False
+
+
+class_prepared.connect(_prepare_field_plan)
+
+
+def current_configurations(requests):
+    """
+    Return the active configuration entries for several ConfigurationModels at once.
+
+    Arguments:
+        requests: A list of ``(model_class, key_tuples)`` pairs, where `key_tuples` is a list of
+            tuples of KEY_FIELDS values (use ``[()]`` for models without KEY_FIELDS).
+
+    Returns:
+        A list holding, for each request, the list of entries for its `key_tuples`, in order.
+
+    All the entries are looked up in the request cache, then the remaining ones with a single
+    ``get_many`` on the django cache (skipping keys pending invalidation). Whatever is still
+    missing is read from the database with one query per model, and stored in both cache tiers (only in
+    the request cache for the keys pending invalidation, like ``current()`` does).
+    """
+    cache_keys = [
+        [model_class.current_cache_key(*args) for args in key_tuples]
+        for model_class, key_tuples in requests
+    ]
+    found = {}
+    tiers = {}
+    for key in (key for keys in cache_keys for key in keys):
+        cached_response = DEFAULT_REQUEST_CACHE.get_cached_response(key)
+        if cached_response.is_found and cached_response.value is not None:
+            found[key] = cached_response.value
+            tiers[key] = 'request'
+
+    missing = [key for keys in cache_keys for key in keys if key not in found and not is_pending(key)]
+    if missing:
+        for key, value in cache.get_many(missing).items():
+            if value is not None:
+                DEFAULT_REQUEST_CACHE.set(key, value)
+                found[key] = value
+                tiers[key] = 'django'
+
+    for (model_class, key_tuples), keys in zip(requests, cache_keys):
+        for tier in ('request', 'django'):
+            hits = sum(1 for key in keys if tiers.get(key) == tier)
+            if hits:
+                metrics.increment(metrics.CACHE_HIT, model_class, hits, tier=tier, lookup='current_configurations')
+        missing_args = {key: args for key, args in zip(keys, key_tuples) if key not in found}
+        if not missing_args:
+            continue
+        metrics.increment(metrics.CACHE_MISS, model_class, len(missing_args), lookup='current_configurations')
+        start = time.perf_counter()
+        now = timezone.now()
+        entries = dict(zip(missing_args, model_class.current_from_db_many(list(missing_args.values()))))
+        timeout = model_class.cache_timeout_at(model_class.keys_queryset(list(missing_args.values())), now)
+        metrics.timing(metrics.DB_FALLBACK, model_class, time.perf_counter() - start, lookup='current_configurations')
+        for key, entry in entries.items():
+            DEFAULT_REQUEST_CACHE.set(key, entry)
+            metrics.payload_size(model_class, entry, lookup='current_configurations')
+        committed = {key: entry for key, entry in entries.items() if not is_pending(key)}
+        if committed:
+            cache.set_many(committed, timeout)
+        found.update(entries)
+
+    return [[found[key] for key in keys] for keys in cache_keys]
+
+
+class ConfigurationImportRecord(models.Model):
+    """
+    Records which ConfigurationModels a JSON file was imported into by ``populate_model``,
+    along with the newest entry of each model at that time.
+
+    If a file with the same digest is imported again and none of its models has gained
+    entries since, the import can be skipped without parsing the file.
+    """
+
+    digest = models.CharField(max_length=64)
+    model_label = models.CharField(max_length=255)
+    latest_id = models.IntegerField(null=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('digest', 'model_label')
+
+    def __str__(self):
+        return f"ConfigurationImportRecord(digest={self.digest}, model_label={self.model_label})"
@@ -0,0 +1,58 @@
+"""
+Reading of the JSON files imported by ``populate_model``.
+
+This module doesn't import Django, so that files can be parsed in worker processes, including ones
+started with the ``spawn`` method (the default on macOS and Windows), where Django isn't set up.
+"""
+import hashlib
+import json
+
+
+def check_config_blocks(parsed_json):
+    """
+    Return the list of ``{"model": ..., "data": [...]}`` blocks of a parsed JSON document.
+
+    The document may be either a single block, or a manifest carrying several of them:
+        { "models":
+            [
+              { "model": "config_models.ExampleConfigurationModel", "data": [...] },
+              { "model": "config_models.ExampleKeyedConfigurationModel", "data": [...] },
+              ...
+            ]
+        }
+
+    Only the structure of the document is checked here; resolving the models and validating
+    the entries is left to ``deserialize_config_block``, since those need the database.
+    """
+    if not isinstance(parsed_json, dict):
+        raise ValueError("The JSON document must be an object holding a configuration block or a 'models' list")
+    blocks = parsed_json["models"] if "models" in parsed_json else [parsed_json]
+    if not isinstance(blocks, list):
+        raise ValueError("The 'models' of a manifest must be a list of configuration blocks")
+    for block in blocks:
+        if (
+            not isinstance(block, dict)
+            or not isinstance(block.get("model"), str)
+            or not isinstance(block.get("data"), list)
+        ):
+            raise ValueError("Each configuration block needs a 'model' label and a 'data' list")
+    return blocks
+
+
+def load_config_file(path):
+    """
+    Read and parse the JSON file at `path`, returning its configuration blocks.
+    """
+    with open(path, "rb") as stream:
+        return check_config_blocks(json.load(stream))
+
+
+def file_digest(path):
+    """
+    Return the SHA-256 hex digest of the contents of the file at `path`.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as stream:
+        for chunk in iter(lambda: stream.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
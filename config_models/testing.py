@@ -0,0 +1,102 @@
+"""
+Test helpers for code using :class:`.ConfigurationModel` subclasses.
+"""
+from contextlib import contextmanager
+from unittest import mock
+
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+# The django cache operations counted by assert_config_budget, by counter.
+CACHE_OPERATIONS = {
+    'cache_gets': ('get', 'get_many'),
+    'cache_sets': ('set', 'set_many'),
+    'cache_deletes': ('delete', 'delete_many'),
+}
+
+
+class ConfigBudget:
+    """
+    The database queries and django cache operations counted by ``assert_config_budget``.
+    """
+
+    def __init__(self, captured_queries):
+        self._captured_queries = captured_queries
+        self.cache_gets = 0
+        self.cache_sets = 0
+        self.cache_deletes = 0
+        # Whether a counted cache operation is running: backends may implement get_many with get, etc.
+        self.in_cache_operation = False
+
+    @property
+    def queries(self):
+        """ The number of database queries """
+        return len(self._captured_queries)
+
+    @property
+    def captured_queries(self):
+        """ The SQL of the database queries """
+        return [query['sql'] for query in self._captured_queries.captured_queries]
+
+
+@contextmanager
+def assert_config_budget(queries=None, cache_gets=None, cache_sets=None, cache_deletes=None, using=DEFAULT_DB_ALIAS):
+    """
+    Assert that the code in the block makes exactly the given numbers of database queries (on the
+    `using` database) and of operations on the default django cache, the second tier of TieredCache.
+    Counts left to None are not checked.
+
+    Calls of ``get_many``, ``set_many`` and ``delete_many`` count as single operations, as they are
+    single round trips. Request cache operations are not counted.
+
+        with assert_config_budget(queries=0, cache_gets=1):
+            MyConfiguration.current()
+
+    Yields: the ``ConfigBudget`` holding the counts
+    """
+    cache_backend = caches['default']
+    with CaptureQueriesContext(connections[using]) as captured_queries:
+        budget = ConfigBudget(captured_queries)
+        patches = [
+            mock.patch.object(
+                cache_backend, method_name, side_effect=_counting(budget, counter, getattr(cache_backend, method_name))
+            )
+            for counter, method_names in CACHE_OPERATIONS.items()
+            for method_name in method_names
+        ]
+        for patch in patches:
+            patch.start()
+        try:
+            yield budget
+        finally:
+            for patch in reversed(patches):
+                patch.stop()
+
+    expected = {'queries': queries, 'cache_gets': cache_gets, 'cache_sets': cache_sets, 'cache_deletes': cache_deletes}
+    errors = [
+        f"{name}: {getattr(budget, name)} made, {count} expected"
+        for name, count in expected.items()
+        if count is not None and getattr(budget, name) != count
+    ]
+    if errors:
+        queries_made = '\n'.join(f"{index}. {sql}" for index, sql in enumerate(budget.captured_queries, start=1))
+        raise AssertionError(
+            "Configuration budget not matched: " + "; ".join(errors) + "\nQueries:\n" + (queries_made or 'none')
+        )
+
+
+def _counting(budget, counter, method):
+    """
+    Return a function incrementing the `counter` of `budget`, then calling `method`.
+    """
+    def _count(*args, **kwargs):
+        if budget.in_cache_operation:
+            return method(*args, **kwargs)
+        setattr(budget, counter, getattr(budget, counter) + 1)
+        budget.in_cache_operation = True
+        try:
+            return method(*args, **kwargs)
+        finally:
+            budget.in_cache_operation = False
+    return _count
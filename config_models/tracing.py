@@ -0,0 +1,101 @@
+"""
+Tracing spans and slow-lookup logging around configuration lookups.
+
+Both are disabled by default:
+
+* ``CONFIG_MODELS_TRACER``: the dotted path of a function returning an OpenTelemetry-compatible
+  tracer, i.e. an object with a ``start_as_current_span(name, attributes=...)`` context manager.
+  ``config_models.tracing.opentelemetry_tracer`` returns the tracer of the installed
+  ``opentelemetry-api`` package.
+* ``CONFIG_MODELS_SLOW_LOOKUP_SECONDS``: lookups taking longer than this are logged as warnings by
+  the ``config_models.slow_lookups`` logger, with the model, the keys, the cache tier that served the
+  value and the last ``CONFIG_MODELS_SLOW_LOOKUP_STACK_DEPTH`` (8 by default) frames of the stack.
+"""
+import logging
+import time
+import traceback
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+log = logging.getLogger('config_models.slow_lookups')
+
+_config = {}
+
+
+def opentelemetry_tracer():
+    """
+    Return the OpenTelemetry tracer of config_models. Requires the ``opentelemetry-api`` package.
+    """
+    from opentelemetry import trace  # pylint: disable=import-outside-toplevel,import-error
+    return trace.get_tracer('config_models')
+
+
+def _get_config():
+    """
+    Return the tracer and the slow-lookup settings, read once from the settings.
+    """
+    if not _config:
+        tracer_path = getattr(settings, 'CONFIG_MODELS_TRACER', None)
+        _config['tracer'] = import_string(tracer_path)() if tracer_path else None
+        _config['slow_seconds'] = getattr(settings, 'CONFIG_MODELS_SLOW_LOOKUP_SECONDS', None)
+        _config['stack_depth'] = getattr(settings, 'CONFIG_MODELS_SLOW_LOOKUP_STACK_DEPTH', 8)
+    return _config
+
+
+@receiver(setting_changed)
+def _reset_config(setting, **kwargs):
+    if setting.startswith('CONFIG_MODELS_TRACER') or setting.startswith('CONFIG_MODELS_SLOW_LOOKUP'):
+        _config.clear()
+
+
+class trace_lookup:  # pylint: disable=invalid-name
+    """
+    Context manager tracing the configuration lookup `name` of `model` (if it concerns a single
+    model) for `keys`.
+
+    The code in the block sets ``tier`` to the cache tier (``request`` or ``django``) that served
+    the value, if any.
+    """
+    __slots__ = ('name', 'model', 'keys', 'tier', '_start', '_span_manager', '_span')
+
+    def __init__(self, name, model, keys=()):
+        self.name = name
+        self.model = model
+        self.keys = keys
+        self.tier = None
+        self._start = None
+        self._span_manager = None
+        self._span = None
+
+    def _label(self):
+        return self.model._meta.label if self.model is not None else ''
+
+    def __enter__(self):
+        config = _get_config()
+        if config['tracer'] is not None:
+            self._span_manager = config['tracer'].start_as_current_span(
+                f'config_models.{self.name}',
+                attributes={'config_models.model': self._label(), 'config_models.keys': repr(self.keys)},
+            )
+            self._span = self._span_manager.__enter__()
+        if config['slow_seconds'] is not None:
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        if self._start is not None:
+            duration = time.perf_counter() - self._start
+            config = _get_config()
+            if duration > config['slow_seconds']:
+                log.warning(
+                    "Slow configuration lookup %s of %s for keys %r: %.1f ms, served by %s\n%s",
+                    self.name, self._label(), self.keys, duration * 1000, self.tier or 'the database',
+                    ''.join(traceback.format_stack(limit=config['stack_depth'] + 1)[:-1]),
+                )
+        if self._span_manager is not None:
+            self._span.set_attribute('config_models.tier', self.tier or 'database')
+            return self._span_manager.__exit__(exc_type, exc_value, exc_traceback)
+        return False
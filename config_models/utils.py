@@ -2,15 +2,45 @@
 Utilities for working with ConfigurationModels.
 """
 
+from functools import lru_cache
+from operator import attrgetter
 
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
 from rest_framework.parsers import JSONParser
+from rest_framework.relations import ManyRelatedField, RelatedField
 from rest_framework.serializers import ModelSerializer
 
+from config_models.invalidation import batched_invalidation
+from config_models.models import ConfigurationImportRecord, ConfigurationModel
+from config_models.parsing import check_config_blocks
+from config_models.tracing import trace_lookup
 
+
+def get_configuration_model(label):
+    """
+    Return the ConfigurationModel class with the given `app_label.Model` label.
+
+    Raises: ValueError if there is no such model, or if it isn't a ConfigurationModel.
+    """
+    try:
+        model_class = apps.get_model(label)
+    except (LookupError, ValueError) as error:
+        raise ValueError(str(error)) from error
+    if not issubclass(model_class, ConfigurationModel):
+        raise ValueError(_("{0} is not a ConfigurationModel").format(label))
+    return model_class
+
+
+@lru_cache(maxsize=None)
 def get_serializer_class(configuration_model):
-    """ Returns a ConfigurationModel serializer class for the supplied configuration_model. """
+    """
+    Returns a ConfigurationModel serializer class for the supplied configuration_model.
+
+    The class is built once per model and shared by every caller in the process.
+    """
     class AutoConfigModelSerializer(ModelSerializer):
         """Serializer class for configuration models."""
 
@@ -28,6 +58,122 @@ def get_serializer_class(configuration_model):
     return AutoConfigModelSerializer
 
 
+class ConfigurationModelReadSerializer:
+    """
+    Read-only serializer producing the same representation as ``get_serializer_class(configuration_model)``.
+
+    The DRF fields are introspected once, when the serializer is built, and reduced to a plan of
+    attribute getters. Serializing an instance then only walks that plan, instead of building
+    and binding a fresh set of fields for every instance.
+    """
+
+    def __init__(self, configuration_model):
+        self.model = configuration_model
+        self._plan = []
+        for name, field in get_serializer_class(configuration_model)().fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, ManyRelatedField):
+                self._plan.append((name, self._many_related_getter(field.source), None))
+            elif isinstance(field, RelatedField):
+                attname = configuration_model._meta.get_field(field.source).attname
+                self._plan.append((name, attrgetter(attname), None))
+            else:
+                self._plan.append((name, attrgetter(field.source), field.to_representation))
+
+    @staticmethod
+    def _many_related_getter(source):
+        """
+        Return a function listing the primary keys of the `source` many-to-many relation of an instance.
+        """
+        def _getter(instance):
+            # Relations can't be queried on instances that haven't been saved.
+            if instance.pk is None:
+                return []
+            return [related.pk for related in getattr(instance, source).all()]
+        return _getter
+
+    def to_representation(self, instance):
+        """
+        Return a dict of the serialized fields of `instance`.
+        """
+        data = {}
+        for name, getter, to_representation in self._plan:
+            value = getter(instance)
+            data[name] = to_representation(value) if to_representation and value is not None else value
+        return data
+
+
+@lru_cache(maxsize=None)
+def get_read_serializer(configuration_model):
+    """ Returns the shared ConfigurationModelReadSerializer for the supplied configuration_model. """
+    return ConfigurationModelReadSerializer(configuration_model)
+
+
+def parse_config_json(stream):
+    """
+    Parse a stream containing JSON into a list of ``{"model": ..., "data": [...]}`` blocks.
+
+    The stream may contain either a single block, as described in ``deserialize_json``, or a
+    manifest carrying several of them (see ``config_models.parsing.check_config_blocks``).
+    """
+    return check_config_blocks(JSONParser().parse(stream))
+
+
+def _latest_id(model_label):
+    """
+    Return the id of the newest entry of the ConfigurationModel with label `model_label`, or None.
+    """
+    return apps.get_model(model_label).objects.order_by('-pk').values_list('pk', flat=True).first()
+
+
+def is_import_current(digest):
+    """
+    Returns True if a file with this digest has already been imported, and none of the
+    ConfigurationModels it was imported into has gained entries since.
+    """
+    records = list(ConfigurationImportRecord.objects.filter(digest=digest))
+    return bool(records) and all(record.latest_id == _latest_id(record.model_label) for record in records)
+
+
+def record_import(digest, model_labels):
+    """
+    Remember that a file with this digest was imported into the ConfigurationModels labelled `model_labels`.
+    """
+    for model_label in model_labels:
+        ConfigurationImportRecord.objects.update_or_create(
+            digest=digest,
+            model_label=model_label,
+            defaults={'latest_id': _latest_id(model_label)},
+        )
+
+
+def deserialize_config_block(block, username):
+    """
+    Create ConfigurationModel entries for a single parsed ``{"model": ..., "data": [...]}`` block.
+
+    Entries identical to the current configuration are skipped, and the remaining entries
+    are written in a single transaction.
+
+    Returns: the number of created entries
+    """
+    model_class = apps.get_model(block["model"])
+    with trace_lookup('deserialize_config_block', model_class):
+        serializer_class = get_serializer_class(model_class)
+        list_serializer = serializer_class(data=block["data"], context={"changed_by_username": username}, many=True)
+        if not list_serializer.is_valid():
+            raise Exception(list_serializer.error_messages)
+
+        for data in reversed(list_serializer.validated_data):
+            if model_class.equal_to_current(data):
+                list_serializer.validated_data.remove(data)
+
+        entries_created = len(list_serializer.validated_data)
+        with batched_invalidation(), transaction.atomic():
+            list_serializer.save()
+        return entries_created
+
+
 def deserialize_json(stream, username):
     """
     Given a stream containing JSON, deserializers the JSON into ConfigurationModel instances.
@@ -48,6 +194,8 @@ def deserialize_json(stream, username):
             ]
         }
 
+    A manifest of several such blocks, as described in ``parse_config_json``, is also accepted.
+
     If the provided stream does not contain valid JSON for the ConfigurationModel specified,
     an Exception will be raised.
 
@@ -57,17 +205,5 @@ def deserialize_json(stream, username):
 
     Returns: the number of created entries
     """
-    parsed_json = JSONParser().parse(stream)
-    serializer_class = get_serializer_class(apps.get_model(parsed_json["model"]))
-    list_serializer = serializer_class(data=parsed_json["data"], context={"changed_by_username": username}, many=True)
-    if list_serializer.is_valid():
-        model_class = serializer_class.Meta.model
-        for data in reversed(list_serializer.validated_data):
-            if model_class.equal_to_current(data):
-                list_serializer.validated_data.remove(data)
-
-        entries_created = len(list_serializer.validated_data)
-        list_serializer.save()
-        return entries_created
-    else:
-        raise Exception(list_serializer.error_messages)
+    with trace_lookup('deserialize_json', None):
+        return sum(deserialize_config_block(block, username) for block in parse_config_json(stream))
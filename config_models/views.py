@@ -2,13 +2,26 @@
 API view to allow manipulation of configuration models.
 """
 
+from datetime import timezone as dt_timezone
 
+from django.apps import apps
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
 from rest_framework.authentication import SessionAuthentication
-from rest_framework.generics import CreateAPIView, RetrieveAPIView
-from rest_framework.permissions import DjangoModelPermissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveAPIView
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import SAFE_METHODS, DjangoModelPermissions, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from config_models.utils import get_serializer_class
+from config_models.invalidation import batched_invalidation
+from config_models.models import ConfigurationModel, current_configurations
+from config_models.utils import get_read_serializer, get_serializer_class
 
 
 class ReadableOnlyByAuthors(DjangoModelPermissions):
@@ -18,17 +31,22 @@ class ReadableOnlyByAuthors(DjangoModelPermissions):
 
 
 class AtomicMixin:
-    """Mixin to provide atomic transaction for as_view."""
+    """Mixin to provide atomic transaction for as_view on requests that can write (i.e. unsafe methods)."""
     @classmethod
     def create_atomic_wrapper(cls, wrapped_func):
         """Returns a wrapped function."""
-        def _create_atomic_wrapper(*args, **kwargs):
+        def _create_atomic_wrapper(request, *args, **kwargs):
             """Actual wrapper."""
+            # Safe methods only read, so there is nothing for a transaction to protect, and
+            # skipping it saves the round trips to open and close it.
+            if request.method in SAFE_METHODS:
+                return wrapped_func(request, *args, **kwargs)
             # When a view call fails due to a permissions error, it raises an exception.
             # An uncaught exception breaks the DB transaction for any following DB operations
             # unless it's wrapped in a atomic() decorator or context manager.
-            with transaction.atomic():
-                return wrapped_func(*args, **kwargs)
+            # The cache keys invalidated by the writes of the request are deleted all at once.
+            with batched_invalidation(), transaction.atomic():
+                return wrapped_func(request, *args, **kwargs)
 
         return _create_atomic_wrapper
 
@@ -60,11 +78,242 @@ class ConfigurationModelCurrentAPIView(AtomicMixin, CreateAPIView, RetrieveAPIVi
         return self.model.current()
 
     def get_serializer_class(self):
-        if self.serializer_class is None:
-            self.serializer_class = get_serializer_class(self.model)
+        return self.serializer_class or get_serializer_class(self.model)
 
-        return self.serializer_class
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Return the current configuration, or a 304 response if the client's copy is still current.
+
+        The ETag and Last-Modified validators only depend on the current entry (usually a cache
+        hit), so conditional requests are answered before anything is serialized.
+        """
+        current = self.get_object()
+        etag, last_modified = self.get_validators(current)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            if self.serializer_class is not None:
+                response = Response(self.get_serializer(current).data)
+            else:
+                # The auto-generated serializer only reads model fields, so use the lightweight equivalent.
+                response = Response(get_read_serializer(self.model).to_representation(current))
+
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def get_validators(self, current):
+        """
+        Return the ETag and the Last-Modified timestamp (or None) for the `current` configuration entry.
+        """
+        etag = quote_etag(f"{self.model._meta.label}:{current.pk}:{current.change_date}")
+        if current.change_date is None:
+            return etag, None
+        change_date = current.change_date
+        if not timezone.is_aware(change_date):
+            change_date = timezone.make_aware(change_date, dt_timezone.utc)
+        return etag, int(change_date.timestamp())
 
     def perform_create(self, serializer):
         # Set the requesting user as the one who is updating the configuration
         serializer.save(changed_by=self.request.user)
+
+
+class CurrentSetPagination(CursorPagination):
+    """
+    Keyset pagination over the ids of the current entries.
+
+    Each page is fetched with ``id > <last id of the previous page>``, so the cost of a page
+    does not grow with its position in the set.
+    """
+    ordering = 'pk'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+class ConfigurationModelCurrentSetAPIView(ListAPIView):
+    """
+    This view allows an authenticated user with the appropriate model permissions
+    to list the current configuration entries of a keyed `model` (i.e. one with KEY_FIELDS).
+
+    Entries can be filtered on any of the KEY_FIELDS using query parameters, e.g. ``?left=a&user=3``.
+
+    Like other APIViews, you can use this by using a url pattern similar to the following::
+
+        url(r'config/example_keyed_config$', ConfigurationModelCurrentSetAPIView.as_view(model=ExampleKeyedConfig))
+    """
+    authentication_classes = (SessionAuthentication,)
+    permission_classes = (ReadableOnlyByAuthors,)
+    pagination_class = CurrentSetPagination
+    model = None
+
+    def get_queryset(self):
+        return self.model.objects.current_set()
+
+    def filter_queryset(self, queryset):
+        key_filters = {
+            key: self.request.query_params[key]
+            for key in self.model.KEY_FIELDS
+            if key in self.request.query_params
+        }
+        try:
+            return queryset.filter(**key_filters)
+        except (DjangoValidationError, ValueError) as error:
+            raise ValidationError({'detail': str(error)}) from error
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        read_serializer = get_read_serializer(self.model)
+        return self.get_paginated_response([read_serializer.to_representation(entry) for entry in page])
+
+
+class ConfigurationModelBatchCurrentAPIView(APIView):
+    """
+    This view returns the current configuration of several models in a single request.
+
+    The request body lists the models by label, along with the tuples of KEY_FIELDS values to
+    look up for keyed models::
+
+        {"models": ["example.ExampleConfig", {"model": "example.ExampleKeyedConfig", "keys": [["a", "b", 1]]}]}
+
+    The response maps each label to its current configuration, or to the list of current entries
+    for the requested keys. The user needs the permissions ``ReadableOnlyByAuthors`` requires for
+    every requested model.
+
+    Like other APIViews, you can use this by using a url pattern similar to the following::
+
+        url(r'config/batch$', ConfigurationModelBatchCurrentAPIView.as_view())
+    """
+    authentication_classes = (SessionAuthentication,)
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request):
+        """
+        Return the current configuration of the requested models.
+        """
+        requests = [self._parse_model_request(model_request) for model_request in self._model_requests(request)]
+        for _label, model_class, _key_tuples in requests:
+            required_permissions = ReadableOnlyByAuthors().get_required_permissions('GET', model_class)
+            if not request.user.has_perms(required_permissions):
+                self.permission_denied(request)
+
+        try:
+            entries = current_configurations(
+                [(model_class, key_tuples) for _label, model_class, key_tuples in requests]
+            )
+        except (DjangoValidationError, ValueError) as error:
+            raise ValidationError({'models': str(error)}) from error
+        data = {}
+        for (label, model_class, _key_tuples), model_entries in zip(requests, entries):
+            read_serializer = get_read_serializer(model_class)
+            if model_class.KEY_FIELDS:
+                data[label] = [read_serializer.to_representation(entry) for entry in model_entries]
+            else:
+                data[label] = read_serializer.to_representation(model_entries[0])
+        return Response(data)
+
+    @staticmethod
+    def _model_requests(request):
+        """
+        Return the list of model requests in the request body.
+        """
+        model_requests = request.data.get('models') if hasattr(request.data, 'get') else None
+        if not isinstance(model_requests, list):
+            raise ValidationError({'models': 'Expected a list of models.'})
+        return model_requests
+
+    @staticmethod
+    def _parse_model_request(model_request):
+        """
+        Return the label, ConfigurationModel class and key tuples of a single model request.
+        """
+        if isinstance(model_request, str):
+            model_request = {'model': model_request}
+        label = model_request.get('model') if isinstance(model_request, dict) else None
+        try:
+            model_class = apps.get_model(label)
+        except (LookupError, TypeError, ValueError) as error:
+            raise ValidationError({'models': f'Unknown model {label}.'}) from error
+        if not issubclass(model_class, ConfigurationModel):
+            raise ValidationError({'models': f'{label} is not a ConfigurationModel.'})
+
+        if not model_class.KEY_FIELDS:
+            return label, model_class, [()]
+        key_tuples = model_request.get('keys')
+        if not isinstance(key_tuples, list) or not all(
+            isinstance(args, list) and len(args) == len(model_class.KEY_FIELDS) for args in key_tuples
+        ):
+            raise ValidationError({
+                'models': f'{label} needs a list of keys, each with values for {", ".join(model_class.KEY_FIELDS)}.'
+            })
+        return label, model_class, [tuple(args) for args in key_tuples]
+
+
+class ConfigurationModelBatchCreateAPIView(AtomicMixin, CreateAPIView):
+    """
+    This view allows an authenticated user with the appropriate model permissions
+    to create many configuration entries of a keyed `model` in a single request.
+
+    The request body is a list of entries, in the format accepted by ConfigurationModelCurrentAPIView.
+    Entries identical to the current entry for their keys are skipped, the others are inserted
+    in one transaction. The response lists, for each entry, whether it was ``created`` or
+    ``unchanged`` and the id of the resulting current entry.
+
+    Like other APIViews, you can use this by using a url pattern similar to the following::
+
+        url(
+            r'config/example_keyed_config/batch$',
+            ConfigurationModelBatchCreateAPIView.as_view(model=ExampleKeyedConfig),
+        )
+    """
+    authentication_classes = (SessionAuthentication,)
+    permission_classes = (ReadableOnlyByAuthors,)
+    model = None
+
+    def get_queryset(self):
+        return self.model.objects.all()
+
+    def get_serializer_class(self):
+        return self.serializer_class or get_serializer_class(self.model)
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            raise ValidationError({'detail': 'Expected a list of entries.'})
+        serializer = self.get_serializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            return Response({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        many_to_many = {field.name for field in self.model._meta.many_to_many}
+        entries = []
+        for data in serializer.validated_data:
+            fields = {name: value for name, value in data.items() if name not in many_to_many}
+            entry = self.model(**fields)  # pylint: disable=not-callable
+            entry.changed_by = request.user
+            entries.append((entry, {name: value for name, value in data.items() if name in many_to_many}))
+
+        key_tuples = [tuple(getattr(entry, key) for key in self.model.KEY_FIELDS) for entry, _related in entries]
+        latest = {}
+        results = []
+        to_create = []
+        for (entry, related), key_tuple, current in zip(entries, key_tuples, self.model.current_many(key_tuples)):
+            # Compare against the latest entry for these keys, including earlier entries of this batch.
+            previous = latest.get(key_tuple, current if current.pk is not None else None)
+            # pylint: disable=protected-access
+            if previous is not None and not related and previous._equals_current(entry):
+                results.append(('unchanged', previous))
+                continue
+            latest[key_tuple] = entry
+            results.append(('created', entry))
+            to_create.append((entry, related))
+
+        self.model.bulk_save([entry for entry, _related in to_create])
+        for entry, related in to_create:
+            for name, value in related.items():
+                getattr(entry, name).set(value)
+
+        results = [{'status': result_status, 'id': entry.pk} for result_status, entry in results]
+        return Response(
+            {'results': results},
+            status=status.HTTP_201_CREATED if to_create else status.HTTP_200_OK,
+        )
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:30
+
+import config_models.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('example', '0002_exampledecoratorconfig_exampledeserializeconfig'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exampledeserializeconfig',
+            name='content_hash',
+            field=config_models.models.ContentHashField(blank=True, default='', editable=False, max_length=64),
+        ),
+    ]
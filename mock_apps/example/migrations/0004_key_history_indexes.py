@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('example', '0003_exampledeserializeconfig_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='exampledeserializeconfig',
+            index=models.Index(fields=['name', 'change_date'], name='example_exa_name_43c411_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examplekeyedconfig',
+            index=models.Index(fields=['left', 'right', 'user', 'change_date'], name='example_exa_left_61f781_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:43
+
+import config_models.models
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('example', '0004_key_history_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExampleScheduledConfig',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('change_date', models.DateTimeField(auto_now_add=True, verbose_name='Change date')),
+                ('enabled', models.BooleanField(default=False, verbose_name='Enabled')),
+                ('name', models.CharField(max_length=30)),
+                ('int_field', models.IntegerField(default=10)),
+                ('effective_date', config_models.models.EffectiveDateField(blank=True, null=True, verbose_name='Effective date')),
+                ('changed_by', models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, to=settings.AUTH_USER_MODEL, verbose_name='Changed by')),
+            ],
+            options={
+                'ordering': ('-change_date',),
+                'abstract': False,
+                'indexes': [models.Index(fields=['name', 'change_date'], name='example_exa_name_46bb8d_idx')],
+            },
+        ),
+    ]
@@ -2,7 +2,7 @@ from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import models
 
-from config_models.models import ConfigurationModel
+from config_models.models import ConfigurationModel, ContentHashField, EffectiveDateField
 
 
 class ExampleConfig(ConfigurationModel):
@@ -42,6 +42,9 @@ class ExampleKeyedConfig(ConfigurationModel):
 
     KEY_FIELDS = ('left', 'right', 'user')
 
+    class Meta(ConfigurationModel.Meta):
+        indexes = [models.Index(fields=['left', 'right', 'user', 'change_date'])]
+
     left = models.CharField(max_length=30)
     right = models.CharField(max_length=30)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='test_user')
@@ -69,10 +72,35 @@ class ExampleDeserializeConfig(ConfigurationModel):
     """
     KEY_FIELDS = ('name',)
 
+    class Meta(ConfigurationModel.Meta):
+        indexes = [models.Index(fields=['name', 'change_date'])]
+
     name = models.TextField()
     int_field = models.IntegerField(default=10)
+    content_hash = ContentHashField()
 
     def __str__(self):
         return "ExampleDeserializeConfig(enabled={}, name={}, int_field={})".format(
             self.enabled, self.name, self.int_field
         )
+
+
+class ExampleScheduledConfig(ConfigurationModel):
+    """
+    Test model for testing ``ConfigurationModels`` with entries scheduled ahead of time.
+    """
+    cache_timeout = 300
+
+    KEY_FIELDS = ('name',)
+
+    name = models.CharField(max_length=30)
+    int_field = models.IntegerField(default=10)
+    effective_date = EffectiveDateField()
+
+    class Meta(ConfigurationModel.Meta):
+        indexes = [models.Index(fields=['name', 'change_date'])]
+
+    def __str__(self):
+        return "ExampleScheduledConfig(enabled={}, name={}, int_field={}, effective_date={})".format(
+            self.enabled, self.name, self.int_field, self.effective_date
+        )
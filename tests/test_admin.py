@@ -3,15 +3,21 @@ ConfigurationModel Admin Module Test Cases
 """
 from unittest.mock import patch
 
+from django.contrib import admin as django_admin
 from django.contrib.admin.sites import AdminSite
+from django.contrib.admin.widgets import (AutocompleteSelect,
+                                          ForeignKeyRawIdWidget,
+                                          ManyToManyRawIdWidget)
 from django.contrib.auth import get_user_model
 from django.contrib.messages.storage.fallback import FallbackStorage
 from django.http import HttpRequest
-from django.test import TestCase
-from example.models import ExampleKeyedConfig
+from django.test import RequestFactory, TestCase
+from example.models import (ExampleConfig, ExampleKeyedConfig,
+                            ManyToManyExampleConfig)
 
 from config_models import admin
 from config_models.models import ConfigurationModel
+from config_models.testing import assert_config_budget
 
 User = get_user_model()
 
@@ -95,3 +101,190 @@ class KeyedAdminTestCase(TestCase, AdminTestCaseMixin):
         self.assertIn(
             "&lt;script&gt;", edit_link,
         )
+
+
+class KeyedAdminHistoryTestCase(TestCase):
+    """
+    Test case for the history changelist of KeyedConfigurationModelAdmin.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_superuser(username='admin_user')
+        self.conf_admin = admin.KeyedConfigurationModelAdmin(ExampleKeyedConfig, AdminSite())
+        for index in range(3):
+            ExampleKeyedConfig.objects.create(left='left_a', right='right', user=self.user, int_field=index)
+        ExampleKeyedConfig.objects.create(left='left_b', right='right', user=self.user, int_field=10)
+
+    def get_changelist(self, **params):
+        """
+        Return the changelist instance, with its results, for the given query parameters.
+        """
+        request = RequestFactory().get('/admin/example/examplekeyedconfig/', params)
+        request.user = self.user
+        return self.conf_admin.get_changelist_instance(request)
+
+    def test_history_active_flags(self):
+        # Two counts, the page (joined with its users), and the current ids of the page's keys.
+        with assert_config_budget(queries=4, cache_gets=0, cache_sets=0, cache_deletes=0):
+            changelist = self.get_changelist(show_history='1')
+            active = {entry.int_field: entry.is_active for entry in changelist.result_list}
+        self.assertEqual({0: False, 1: False, 2: True, 10: True}, active)
+
+    def test_current_set(self):
+        changelist = self.get_changelist()
+        self.assertEqual({2, 10}, {entry.int_field for entry in changelist.result_list})
+        self.assertTrue(all(entry.is_active for entry in changelist.result_list))
+
+    def test_list_select_related(self):
+        self.assertEqual(
+            ['changed_by', 'user'],
+            self.conf_admin.get_list_select_related(RequestFactory().get('/')),
+        )
+
+    def test_estimated_count(self):
+        class EstimatedCountAdmin(admin.KeyedConfigurationModelAdmin):
+            estimated_count = True
+
+        conf_admin = EstimatedCountAdmin(ExampleKeyedConfig, AdminSite())
+        self.assertFalse(conf_admin.show_full_result_count)
+        queryset = ExampleKeyedConfig.objects.all()
+        # SQLite has no table statistics, so the exact count is used.
+        self.assertEqual(4, conf_admin.get_paginator(None, queryset, 100).count)
+
+        with patch.object(admin, 'estimated_row_count', return_value=50000):
+            self.assertEqual(50000, conf_admin.get_paginator(None, queryset, 100).count)
+        with patch.object(admin, 'estimated_row_count', return_value=50):
+            self.assertEqual(4, conf_admin.get_paginator(None, queryset, 100).count)
+
+    def test_estimated_row_count(self):
+        self.assertIsNone(admin.estimated_row_count(ExampleConfig.objects.all()))
+        self.assertIsNone(admin.estimated_row_count(ExampleConfig.objects.filter(enabled=True)))
+
+
+class ChangelistPreviewTestCase(TestCase):
+    """
+    Test case for the truncated previews of text fields in changelists.
+    """
+
+    class PreviewAdmin(admin.KeyedConfigurationModelAdmin):
+        list_preview_fields = ('string_field',)
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_superuser(username='admin_user')
+        self.conf_admin = self.PreviewAdmin(ExampleKeyedConfig, AdminSite())
+        ExampleKeyedConfig.objects.create(left='left', right='right', user=self.user, string_field='x' * 500)
+        ExampleKeyedConfig.objects.create(left='other', right='right', user=self.user, string_field='short')
+
+    def get_changelist(self, conf_admin):
+        request = RequestFactory().get('/admin/example/examplekeyedconfig/')
+        request.user = self.user
+        return conf_admin.get_changelist_instance(request)
+
+    def test_preview_fields(self):
+        request = RequestFactory().get('/')
+        self.assertEqual(['string_field'], self.conf_admin.get_list_preview_fields(request))
+        list_display = self.conf_admin.get_list_display(request)
+        self.assertNotIn('string_field', list_display)
+        self.assertIn('edit_link', list_display)
+
+    def test_truncated_previews(self):
+        changelist = self.get_changelist(self.conf_admin)
+        preview = next(column for column in changelist.list_display if callable(column))
+        entries = {entry.left: entry for entry in changelist.result_list}
+        self.assertEqual({'string_field'}, entries['left'].get_deferred_fields())
+        self.assertEqual('x' * 100 + '…', preview(entries['left']))
+        self.assertEqual('short', preview(entries['other']))
+
+    def test_null_preview(self):
+        changelist = self.get_changelist(self.conf_admin)
+        preview = next(column for column in changelist.list_display if callable(column))
+        entry = changelist.result_list[0]
+        # As annotated for a NULL value, which must not load the deferred field.
+        setattr(entry, admin.preview_annotation_name('string_field'), None)
+        with self.assertNumQueries(0):
+            self.assertIsNone(preview(entry))
+
+    def test_previews_disabled(self):
+        changelist = self.get_changelist(admin.KeyedConfigurationModelAdmin(ExampleKeyedConfig, AdminSite()))
+        self.assertIn('string_field', changelist.list_display)
+        self.assertFalse(any(entry.get_deferred_fields() for entry in changelist.result_list))
+
+
+class LargeRelationWidgetTestCase(TestCase):
+    """
+    Test case for the lookup widgets of relations to large tables.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_superuser(username='admin_user')
+        User.objects.create_user(username='other_user')
+        self.site = AdminSite()
+        self.request = RequestFactory().get('/')
+        self.request.user = self.user
+
+    def get_widget(self, model, field_name, threshold):
+        conf_admin = admin.KeyedConfigurationModelAdmin(model, self.site)
+        conf_admin.large_relation_threshold = threshold
+        widget = conf_admin.get_form(self.request).base_fields[field_name].widget
+        return getattr(widget, 'widget', widget)
+
+    def test_small_table(self):
+        self.assertEqual('Select', type(self.get_widget(ExampleKeyedConfig, 'user', 2)).__name__)
+        self.assertEqual('Select', type(self.get_widget(ExampleKeyedConfig, 'user', None)).__name__)
+
+    def test_raw_id_widget(self):
+        self.assertIsInstance(self.get_widget(ExampleKeyedConfig, 'user', 1), ForeignKeyRawIdWidget)
+        self.assertIsInstance(self.get_widget(ManyToManyExampleConfig, 'many_user_field', 1), ManyToManyRawIdWidget)
+
+    def test_autocomplete_widget(self):
+        class UserAdmin(django_admin.ModelAdmin):
+            search_fields = ('username',)
+
+        self.site.register(User, UserAdmin)
+        self.assertIsInstance(self.get_widget(ExampleKeyedConfig, 'user', 1), AutocompleteSelect)
+
+
+class RevertActionTestCase(TestCase, AdminTestCaseMixin):
+    """
+    Test case for the revert admin action.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_superuser(username='admin_user')
+        self.conf_admin = admin.KeyedConfigurationModelAdmin(ExampleKeyedConfig, AdminSite())
+        self.old_a = ExampleKeyedConfig.objects.create(left='left_a', right='right', user=self.user, int_field=1)
+        self.old_b = ExampleKeyedConfig.objects.create(left='left_b', right='right', user=self.user, int_field=2)
+        ExampleKeyedConfig.objects.create(left='left_a', right='right', user=self.user, int_field=10)
+        ExampleKeyedConfig.objects.create(left='left_b', right='right', user=self.user, int_field=20)
+        self.request = self.get_request()
+        self.request.user = self.user
+
+    def test_revert_single(self):
+        queryset = ExampleKeyedConfig.objects.filter(pk=self.old_a.pk)
+        with patch.object(admin, 'reverse', return_value='/change/'):
+            response = self.conf_admin.revert(self.request, queryset)
+        self.assertEqual(302, response.status_code)
+        self.assertEqual(1, ExampleKeyedConfig.current('left_a', 'right', self.user).int_field)
+
+    def test_revert_several_keys(self):
+        ExampleKeyedConfig.current('left_a', 'right', self.user)
+        queryset = ExampleKeyedConfig.objects.filter(pk__in=[self.old_a.pk, self.old_b.pk])
+        # The selected rows joined with their users, the bulk insert in its savepoint, and a single
+        # invalidation of the django cache for both keys once committed.
+        with assert_config_budget(queries=4, cache_gets=0, cache_sets=0, cache_deletes=1):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertIsNone(self.conf_admin.revert(self.request, queryset))
+
+        self.assertEqual(6, ExampleKeyedConfig.objects.count())
+        self.assertEqual(1, ExampleKeyedConfig.current('left_a', 'right', self.user).int_field)
+        self.assertEqual(2, ExampleKeyedConfig.current('left_b', 'right', self.user).int_field)
+        self.assertEqual(self.user, ExampleKeyedConfig.objects.latest('pk').changed_by)
+
+    def test_revert_same_key(self):
+        queryset = ExampleKeyedConfig.objects.filter(left='left_a')
+        self.assertIsNone(self.conf_admin.revert(self.request, queryset))
+        self.assertEqual(4, ExampleKeyedConfig.objects.count())
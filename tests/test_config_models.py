@@ -1,17 +1,29 @@
 """
 Tests of ConfigurationModel
 """
+import datetime
+import warnings
 from unittest import mock
 
 import ddt
 from django.contrib.auth import get_user_model
-from edx_django_utils.cache.utils import CachedResponse
-from example.models import (ExampleConfig, ExampleKeyedConfig,
+from django.db import connection, transaction
+from django.test import override_settings
+from django.utils import timezone
+from edx_django_utils.cache.utils import CachedResponse, RequestCache, TieredCache
+from example.models import (ExampleConfig, ExampleDeserializeConfig,
+                            ExampleKeyedConfig, ExampleScheduledConfig,
                             ManyToManyExampleConfig)
 from freezegun import freeze_time
 from rest_framework.test import APIRequestFactory
 
-from config_models.views import ConfigurationModelCurrentAPIView
+from config_models import models as config_models_models
+from config_models.models import current_configurations
+from config_models.testing import assert_config_budget
+from config_models.views import (ConfigurationModelBatchCreateAPIView,
+                                 ConfigurationModelBatchCurrentAPIView,
+                                 ConfigurationModelCurrentAPIView,
+                                 ConfigurationModelCurrentSetAPIView)
 
 from .utils import CacheIsolationTestCase
 
@@ -176,6 +188,29 @@ class ConfigurationModelTests(CacheIsolationTestCase):
             ManyToManyExampleConfig.equal_to_current({"string_field": "first", "many_user_field": "removed"})
         )
 
+    def test_field_plan(self):
+        plan = config_models_models.field_plan(ExampleKeyedConfig)
+        # Built when the model class was prepared, and reused.
+        self.assertIs(plan, config_models_models._field_plans[ExampleKeyedConfig])  # pylint: disable=protected-access
+        self.assertIs(plan.compared_values(('id',)), plan.compared_values(['id']))
+        self.assertEqual(
+            ['change_date', 'changed_by', 'enabled', 'left', 'right', 'user', 'string_field', 'int_field'],
+            [field.name for field in plan.compared_fields if field.name != 'id'],
+        )
+        self.assertEqual(
+            frozenset({'many_user_field'}), config_models_models.field_plan(ManyToManyExampleConfig).to_many_names
+        )
+
+    def test_fields_equal_by_id(self):
+        config = ExampleKeyedConfig(left='left', right='right', user=self.user, changed_by=self.user)
+        config.save()
+        stored = ExampleKeyedConfig.objects.get(pk=config.pk)
+        # Foreign keys are compared by id, without loading the related objects.
+        with self.assertNumQueries(0):
+            self.assertTrue(stored.fields_equal(ExampleKeyedConfig(left='left', right='right', user_id=self.user.id)))
+            self.assertFalse(stored.fields_equal(ExampleKeyedConfig(left='left', right='right', user_id=0)))
+            self.assertFalse(stored.fields_equal(ExampleKeyedConfig(left='left', right='right'), ('id',)))
+
 
 @ddt.ddt
 class KeyedConfigurationModelTests(CacheIsolationTestCase):
@@ -325,6 +360,75 @@ class KeyedConfigurationModelTests(CacheIsolationTestCase):
             {1, 2}
         )
 
+    def test_current_set_as_of(self):
+        with freeze_time('2012-01-01'):
+            ExampleKeyedConfig(left='left_a', right='right_a', int_field=0, user=self.user).save()
+        with freeze_time('2012-01-03'):
+            ExampleKeyedConfig(left='left_a', right='right_a', int_field=1, user=self.user).save()
+            ExampleKeyedConfig(left='left_b', right='right_b', int_field=2, user=self.user).save()
+
+        def as_of(date):
+            return set(ExampleKeyedConfig.objects.current_set(as_of=date).values_list('int_field', flat=True))
+
+        self.assertEqual(set(), as_of(datetime.datetime(2011, 12, 31)))
+        self.assertEqual({0}, as_of(datetime.datetime(2012, 1, 2)))
+        self.assertEqual({1, 2}, as_of(datetime.datetime(2012, 1, 3)))
+
+    def test_as_of(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with freeze_time('2012-01-01'):
+                first = ExampleKeyedConfig(left='left_a', right='right_a', int_field=0, user=self.user)
+                first.save()
+            with freeze_time('2012-01-03'):
+                ExampleKeyedConfig(left='left_a', right='right_a', int_field=1, user=self.user).save()
+
+        before = ExampleKeyedConfig.as_of(datetime.datetime(2011, 12, 31), 'left_a', 'right_a', self.user)
+        self.assertIsNone(before.pk)
+        self.assertEqual(('left_a', 10), (before.left, before.int_field))
+
+        # The id is queried, then the entry, which is cached by id without expiry.
+        with assert_config_budget(queries=2, cache_gets=1, cache_sets=1):
+            with mock.patch.object(TieredCache, 'set_all_tiers', wraps=TieredCache.set_all_tiers) as set_all_tiers:
+                entry = ExampleKeyedConfig.as_of(datetime.datetime(2012, 1, 2), 'left_a', 'right_a', self.user)
+        self.assertEqual((first.pk, 0), (entry.pk, entry.int_field))
+        set_all_tiers.assert_called_once_with(ExampleKeyedConfig.entry_cache_key_name(first.pk), entry, None)
+
+        # Any other timestamp resolving to the same entry shares its cached value.
+        RequestCache.clear_all_namespaces()
+        with assert_config_budget(queries=1, cache_gets=1, cache_sets=0):
+            entry = ExampleKeyedConfig.as_of(datetime.datetime(2012, 1, 2, 12), 'left_a', 'right_a', self.user)
+        self.assertEqual(first.pk, entry.pk)
+
+        latest = ExampleKeyedConfig.as_of(datetime.datetime(2012, 1, 4), 'left_a', 'right_a', self.user)
+        self.assertEqual(1, latest.int_field)
+
+    def test_as_of_uncommitted(self):
+        ExampleKeyedConfig(left='left_a', right='right_a', int_field=0, user=self.user).save()
+        with mock.patch.object(TieredCache, 'set_all_tiers') as set_all_tiers:
+            entry = ExampleKeyedConfig.as_of(timezone.now(), 'left_a', 'right_a', self.user)
+        # The transaction of the entry may still roll back, so it is only cached for the request.
+        set_all_tiers.assert_not_called()
+        with self.assertNumQueries(1):
+            self.assertEqual(entry, ExampleKeyedConfig.as_of(timezone.now(), 'left_a', 'right_a', self.user))
+
+    @override_settings(USE_TZ=True, TIME_ZONE='America/New_York')
+    def test_as_of_naive_timestamp(self):
+        with freeze_time('2012-01-01 12:00'):
+            ExampleKeyedConfig(left='left_a', right='right_a', int_field=0, user=self.user).save()
+
+        # Naive timestamps are in the current time zone (7:00 in New York is 12:00 UTC), without
+        # the warning the database layer gives for naive datetimes.
+        naive = datetime.datetime(2012, 1, 1, 7, 30)
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', RuntimeWarning)
+            self.assertEqual(0, ExampleKeyedConfig.as_of(naive, 'left_a', 'right_a', self.user).int_field)
+            self.assertIsNone(ExampleKeyedConfig.as_of(naive.replace(hour=6), 'left_a', 'right_a', self.user).pk)
+            self.assertEqual(1, ExampleKeyedConfig.objects.current_set(as_of=naive).count())
+
+    def test_as_of_arguments(self):
+        with self.assertRaisesRegex(TypeError, r'as_of\(\) takes exactly 4 arguments \(2 given\)'):
+            ExampleKeyedConfig.as_of(datetime.datetime(2012, 1, 1), 'left_a')
+
     def test_active_annotation(self):
         with freeze_time('2012-01-01'):
             ExampleKeyedConfig.objects.create(left='left_a', right='right_a', user=self.user, string_field='first')
@@ -458,6 +562,64 @@ class ConfigurationModelAPITests(CacheIsolationTestCase):
         self.assertEqual('string_value', response.data['string_field'])
         self.assertEqual(20, response.data['int_field'])
 
+    @ddt.data(('get', False), ('head', False), ('options', False), ('post', True))
+    @ddt.unpack
+    def test_atomic_only_for_unsafe_methods(self, method, atomic):
+        request = getattr(self.factory, method)('/config/ExampleConfig', {'string_field': 'string_value'})
+        request.user = self.user
+        with mock.patch('config_models.views.transaction.atomic', wraps=transaction.atomic) as mock_atomic:
+            self.current_view(request)
+        self.assertEqual(atomic, mock_atomic.called)
+
+    def test_conditional_get(self):
+        ExampleConfig(string_field='string_value', int_field=20).save()
+        request = self.factory.get('/config/ExampleConfig')
+        request.user = self.user
+        response = self.current_view(request)
+        self.assertEqual(200, response.status_code)
+        etag = response['ETag']
+        last_modified = response['Last-Modified']
+
+        request = self.factory.get('/config/ExampleConfig', HTTP_IF_NONE_MATCH=etag)
+        request.user = self.user
+        with mock.patch('config_models.views.get_read_serializer') as mock_serializer:
+            response = self.current_view(request)
+            mock_serializer.assert_not_called()
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(etag, response['ETag'])
+
+        request = self.factory.get('/config/ExampleConfig', HTTP_IF_MODIFIED_SINCE=last_modified)
+        request.user = self.user
+        self.assertEqual(304, self.current_view(request).status_code)
+
+        # A new entry changes the validators.
+        ExampleConfig(string_field='new_value', int_field=20).save()
+        request = self.factory.get('/config/ExampleConfig', HTTP_IF_NONE_MATCH=etag)
+        request.user = self.user
+        response = self.current_view(request)
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(etag, response['ETag'])
+        self.assertEqual('new_value', response.data['string_field'])
+
+    def test_conditional_get_no_entry(self):
+        request = self.factory.get('/config/ExampleConfig')
+        request.user = self.user
+        response = self.current_view(request)
+        self.assertNotIn('Last-Modified', response)
+
+        request = self.factory.get('/config/ExampleConfig', HTTP_IF_NONE_MATCH=response['ETag'])
+        request.user = self.user
+        self.assertEqual(304, self.current_view(request).status_code)
+
+    def test_conditional_get_requires_permission(self):
+        request = self.factory.get('/config/ExampleConfig')
+        request.user = self.user
+        etag = self.current_view(request)['ETag']
+
+        request = self.factory.get('/config/ExampleConfig', HTTP_IF_NONE_MATCH=etag)
+        request.user = User.objects.create_user(username='no-perms')
+        self.assertEqual(403, self.current_view(request).status_code)
+
     @ddt.data(
         ('get', [], 200),
         ('post', [{'string_field': 'string_value', 'int_field': 10}], 201),
@@ -477,3 +639,504 @@ class ConfigurationModelAPITests(CacheIsolationTestCase):
         request.user = self.user
         response = self.current_view(request)
         self.assertEqual(status_code, response.status_code)
+
+
+class ConfigurationModelCurrentSetAPITests(CacheIsolationTestCase):
+    """
+    Tests for the current set API of keyed configuration models.
+    """
+    def setUp(self):
+        super().setUp()
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(username='test_user', is_superuser=True)
+        self.other_user = User.objects.create_user(username='other_user')
+        self.list_view = ConfigurationModelCurrentSetAPIView.as_view(model=ExampleKeyedConfig)
+        with freeze_time('2012-01-01'):
+            for index in range(5):
+                ExampleKeyedConfig(left=f'left_{index}', right='right', user=self.user, int_field=index).save()
+        ExampleKeyedConfig(left='left_0', right='right', user=self.user, int_field=100).save()
+        ExampleKeyedConfig(left='left_0', right='right', user=self.other_user, int_field=200).save()
+
+    def get(self, path, as_user=None, **params):
+        """
+        Make a GET request to the list view, returning the response.
+        """
+        request = self.factory.get(path, params)
+        request.user = as_user or self.user
+        return self.list_view(request)
+
+    def test_pages(self):
+        response = self.get('/config/ExampleKeyedConfig', page_size=4)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([1, 2, 3, 4], [entry['int_field'] for entry in response.data['results']])
+
+        response = self.get(response.data['next'])
+        self.assertEqual([100, 200], [entry['int_field'] for entry in response.data['results']])
+        self.assertIsNone(response.data['next'])
+
+    def test_key_filters(self):
+        response = self.get('/config/ExampleKeyedConfig', left='left_0')
+        self.assertEqual([100, 200], [entry['int_field'] for entry in response.data['results']])
+
+        response = self.get('/config/ExampleKeyedConfig', left='left_0', user=self.other_user.id)
+        self.assertEqual([200], [entry['int_field'] for entry in response.data['results']])
+        self.assertEqual(self.other_user.id, response.data['results'][0]['user'])
+
+    def test_invalid_key_filter(self):
+        self.assertEqual(400, self.get('/config/ExampleKeyedConfig', user='not-an-id').status_code)
+
+    def test_permissions(self):
+        self.assertEqual(403, self.get('/config/ExampleKeyedConfig', as_user=self.other_user).status_code)
+
+
+@ddt.ddt
+class ConfigurationModelBatchAPITests(CacheIsolationTestCase):
+    """
+    Tests for the batch read API.
+    """
+    def setUp(self):
+        super().setUp()
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(username='test_user', is_superuser=True)
+        self.batch_view = ConfigurationModelBatchCurrentAPIView.as_view()
+        # Commit the saves, for their keys to be read from the django cache again.
+        with self.captureOnCommitCallbacks(execute=True):
+            ExampleConfig(string_field='unkeyed', int_field=20).save()
+            ExampleKeyedConfig(left='left_a', right='right_a', user=self.user, int_field=1).save()
+            ExampleKeyedConfig(left='left_a', right='right_a', user=self.user, int_field=2).save()
+            ExampleKeyedConfig(left='left_b', right='right_b', user=self.user, int_field=3).save()
+
+    def post(self, data, user=None):
+        """
+        Make a request to the batch view, returning the response.
+        """
+        request = self.factory.post('/config/batch', data, format='json')
+        request.user = user or self.user
+        return self.batch_view(request)
+
+    def test_batch(self):
+        data = {'models': [
+            'example.ExampleConfig',
+            {
+                'model': 'example.ExampleKeyedConfig',
+                'keys': [['left_a', 'right_a', self.user.id], ['left_b', 'right_b', str(self.user.id)], ['x', 'y', 1]],
+            },
+        ]}
+        response = self.post(data)
+        self.assertEqual(200, response.status_code, response.data)
+        self.assertEqual('unkeyed', response.data['example.ExampleConfig']['string_field'])
+        self.assertEqual(
+            [2, 3, 10],
+            [entry['int_field'] for entry in response.data['example.ExampleKeyedConfig']],
+        )
+        self.assertIsNone(response.data['example.ExampleKeyedConfig'][2]['id'])
+
+        # Every entry is now cached.
+        with self.assertNumQueries(0):
+            self.assertEqual(response.data, self.post(data).data)
+
+    def test_batch_invalidated_by_save(self):
+        data = {'models': [{'model': 'example.ExampleKeyedConfig', 'keys': [['left_b', 'right_b', self.user.id]]}]}
+        self.assertEqual(3, self.post(data).data['example.ExampleKeyedConfig'][0]['int_field'])
+        self.assertEqual(
+            ExampleKeyedConfig.current_cache_key('left_b', 'right_b', self.user),
+            ExampleKeyedConfig.current_cache_key('left_b', 'right_b', str(self.user.id)),
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ExampleKeyedConfig(left='left_b', right='right_b', user=self.user, int_field=4).save()
+        RequestCache.clear_all_namespaces()
+        self.assertEqual(4, self.post(data).data['example.ExampleKeyedConfig'][0]['int_field'])
+
+    def test_batch_uses_django_cache(self):
+        ExampleConfig.current()
+        ExampleKeyedConfig.current('left_a', 'right_a', self.user.id)
+        RequestCache.clear_all_namespaces()
+        with self.assertNumQueries(1):
+            entries = current_configurations([
+                (ExampleConfig, [()]),
+                (ExampleKeyedConfig, [('left_a', 'right_a', self.user.id), ('left_b', 'right_b', self.user)]),
+            ])
+        self.assertEqual('unkeyed', entries[0][0].string_field)
+        self.assertEqual([2, 3], [entry.int_field for entry in entries[1]])
+
+        with self.assertNumQueries(0):
+            entries = ExampleKeyedConfig.current_many([('left_b', 'right_b', self.user)])
+        self.assertEqual([3], [entry.int_field for entry in entries])
+
+    def test_permissions(self):
+        user = User.objects.create_user(username='no-perms')
+        response = self.post({'models': ['example.ExampleConfig']}, user=user)
+        self.assertEqual(403, response.status_code)
+
+    @ddt.data(
+        {},
+        {'models': 'example.ExampleConfig'},
+        {'models': ['xxx.yyy']},
+        {'models': ['auth.Group']},
+        {'models': ['example.ExampleKeyedConfig']},
+        {'models': [{'model': 'example.ExampleKeyedConfig', 'keys': [['left_a']]}]},
+        {'models': [{'model': 'example.ExampleKeyedConfig', 'keys': [['left_a', 'right_a', 'not-an-id']]}]},
+    )
+    def test_bad_request(self, data):
+        self.assertEqual(400, self.post(data).status_code)
+
+
+class ConfigurationModelBatchCreateAPITests(CacheIsolationTestCase):
+    """
+    Tests for the batch write API.
+    """
+    def setUp(self):
+        super().setUp()
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(username='test_user', is_superuser=True)
+        self.create_view = ConfigurationModelBatchCreateAPIView.as_view(model=ExampleKeyedConfig)
+        ExampleKeyedConfig(left='left_a', right='right_a', user=self.user, string_field='a', int_field=1).save()
+
+    def post(self, data, user=None):
+        """
+        Make a request to the batch create view, returning the response.
+        """
+        request = self.factory.post('/config/ExampleKeyedConfig/batch', data, format='json')
+        request.user = user or self.user
+        return self.create_view(request)
+
+    def entry(self, left, string_field, int_field=1):
+        """
+        Return the JSON for an entry keyed on `left`.
+        """
+        return {'left': left, 'right': f'right_{left[-1]}', 'user': self.user.id,
+                'string_field': string_field, 'int_field': int_field}
+
+    def test_batch_create(self):
+        # Cache the current value, to check that it is invalidated.
+        self.assertEqual('a', ExampleKeyedConfig.current('left_a', 'right_a', self.user).string_field)
+        existing_id = ExampleKeyedConfig.objects.get().id
+
+        with self.assertNumQueries(11):
+            response = self.post([
+                self.entry('left_a', 'a'),
+                self.entry('left_b', 'b'),
+                self.entry('left_c', 'c'),
+                self.entry('left_c', 'c'),
+                self.entry('left_a', 'changed', int_field=2),
+            ])
+        self.assertEqual(201, response.status_code)
+        statuses = [result['status'] for result in response.data['results']]
+        self.assertEqual(['unchanged', 'created', 'created', 'unchanged', 'created'], statuses)
+        self.assertEqual(existing_id, response.data['results'][0]['id'])
+        self.assertEqual(response.data['results'][2]['id'], response.data['results'][3]['id'])
+
+        self.assertEqual(4, ExampleKeyedConfig.objects.count())
+        current_a = ExampleKeyedConfig.current('left_a', 'right_a', self.user)
+        self.assertEqual(('changed', 2), (current_a.string_field, current_a.int_field))
+        self.assertEqual(self.user, current_a.changed_by)
+        self.assertEqual(response.data['results'][4]['id'], current_a.id)
+
+    def test_all_unchanged(self):
+        with assert_config_budget(cache_deletes=0), self.captureOnCommitCallbacks(execute=True):
+            response = self.post([self.entry('left_a', 'a')])
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([{'status': 'unchanged', 'id': ExampleKeyedConfig.objects.get().id}],
+                         response.data['results'])
+
+    def test_invalid_entries(self):
+        response = self.post([self.entry('left_b', 'b'), {'left': 'left_c'}])
+        self.assertEqual(400, response.status_code)
+        self.assertEqual({}, response.data['errors'][0])
+        self.assertIn('user', response.data['errors'][1])
+        self.assertEqual(1, ExampleKeyedConfig.objects.count())
+
+        self.assertEqual(400, self.post({'left': 'left_b'}).status_code)
+
+    def test_permissions(self):
+        response = self.post([self.entry('left_b', 'b')], user=User.objects.create_user(username='no-perms'))
+        self.assertEqual(403, response.status_code)
+
+    def test_without_bulk_insert_ids(self):
+        # e.g. MySQL, where bulk_create leaves the instances without pk.
+        features = type(connection.features)
+        with mock.patch.object(features, 'can_return_rows_from_bulk_insert', new_callable=mock.PropertyMock,
+                               return_value=False), \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.post([self.entry('left_b', 'b'), self.entry('left_c', 'c')])
+            many_to_many_view = ConfigurationModelBatchCreateAPIView.as_view(model=ManyToManyExampleConfig)
+            request = self.factory.post(
+                '/config/ManyToManyExampleConfig/batch',
+                [{'string_field': 'm2m', 'many_user_field': [self.user.id]}],
+                format='json',
+            )
+            request.user = self.user
+            many_to_many_response = many_to_many_view(request)
+
+        self.assertEqual(201, response.status_code)
+        self.assertEqual(
+            [ExampleKeyedConfig.current('left_b', 'right_b', self.user).id,
+             ExampleKeyedConfig.current('left_c', 'right_c', self.user).id],
+            [result['id'] for result in response.data['results']],
+        )
+        self.assertEqual(201, many_to_many_response.status_code)
+        current = ManyToManyExampleConfig.current()
+        self.assertEqual(current.id, many_to_many_response.data['results'][0]['id'])
+        self.assertEqual([self.user], list(current.many_user_field.all()))
+
+
+@override_settings(CONFIG_MODELS_READ_DATABASE='replica', CONFIG_MODELS_PRIMARY_PIN_SECONDS=60)
+class ReadReplicaTests(CacheIsolationTestCase):
+    """
+    Tests of routing configuration reads to a replica database.
+
+    The test 'replica' database is not a mirror of the default one, so reads that hit it
+    find no entries.
+    """
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='test_user')
+        self.addCleanup(config_models_models._primary_pins.clear)  # pylint: disable=protected-access
+
+    def unpin(self):
+        """
+        Forget recent writes, and their cached values.
+        """
+        config_models_models._primary_pins.clear()  # pylint: disable=protected-access
+        self.clear_caches()
+
+    def test_reads_pinned_to_primary_after_save(self):
+        ExampleConfig(string_field='saved').save()
+        self.assertEqual('saved', ExampleConfig.current().string_field)
+
+        self.unpin()
+        self.assertEqual('', ExampleConfig.current().string_field)
+
+    def test_keyed_reads_pinned_to_primary_after_save(self):
+        ExampleKeyedConfig(left='left', right='right', user=self.user, int_field=1).save()
+        self.assertEqual(1, ExampleKeyedConfig.current('left', 'right', self.user).int_field)
+        self.assertEqual([('left', 'right', self.user.id)], ExampleKeyedConfig.key_values())
+        self.assertEqual(1, ExampleKeyedConfig.objects.current_set().count())
+        self.assertEqual(1, ExampleKeyedConfig.current_many([('left', 'right', self.user.id)])[0].int_field)
+
+        self.unpin()
+        self.assertEqual(10, ExampleKeyedConfig.current('left', 'right', self.user).int_field)
+        self.assertEqual([], ExampleKeyedConfig.key_values())
+        self.assertEqual(0, ExampleKeyedConfig.objects.current_set().count())
+        self.assertIsNone(ExampleKeyedConfig.current_many([('left', 'right', self.user.id)])[0].id)
+
+    def test_other_processes_pinned_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ExampleConfig(string_field='saved').save()
+        # Another process has no pin of its own, and misses the cache.
+        config_models_models._primary_pins.clear()  # pylint: disable=protected-access
+        RequestCache.clear_all_namespaces()
+        self.assertEqual('saved', ExampleConfig.current().string_field)
+
+        self.unpin()
+        self.assertEqual('', ExampleConfig.current().string_field)
+
+    def test_pin_expires(self):
+        with override_settings(CONFIG_MODELS_PRIMARY_PIN_SECONDS=0):
+            ExampleConfig(string_field='saved').save()
+        self.assertEqual('', ExampleConfig.current().string_field)
+
+    @override_settings(CONFIG_MODELS_READ_DATABASE=None)
+    def test_no_replica(self):
+        with override_settings(CONFIG_MODELS_PRIMARY_PIN_SECONDS=0):
+            ExampleConfig(string_field='saved').save()
+        self.assertEqual('saved', ExampleConfig.current().string_field)
+
+
+@ddt.ddt
+class ContentHashTests(CacheIsolationTestCase):
+    """
+    Tests of the content hash column and of skipping unchanged saves.
+    """
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='test_user')
+
+    def test_hash_stored(self):
+        first = ExampleDeserializeConfig(name='name', int_field=3, changed_by=self.user)
+        first.save()
+        self.assertEqual(64, len(first.content_hash))
+        self.assertEqual(first.compute_content_hash(), ExampleDeserializeConfig.objects.get(pk=first.pk).content_hash)
+
+        # The hash doesn't depend on who made the change, or when.
+        second = ExampleDeserializeConfig(name='name', int_field=3)
+        self.assertEqual(first.content_hash, second.compute_content_hash())
+        self.assertNotEqual(
+            first.content_hash, ExampleDeserializeConfig(name='name', int_field=4).compute_content_hash()
+        )
+        self.assertIsNone(ExampleKeyedConfig.content_hash_field())
+
+    def test_bulk_save_hash(self):
+        created = ExampleDeserializeConfig.bulk_save([
+            ExampleDeserializeConfig(name='a'), ExampleDeserializeConfig(name='b'),
+        ])
+        self.assertEqual(
+            [entry.compute_content_hash() for entry in created],
+            list(ExampleDeserializeConfig.objects.order_by('pk').values_list('content_hash', flat=True)),
+        )
+
+    def test_equal_to_current_uses_stored_hash(self):
+        ExampleDeserializeConfig(name='name', int_field=3).save()
+        current = ExampleDeserializeConfig.current('name')
+        self.assertTrue(current.fields_equal(ExampleDeserializeConfig(name='name', int_field=3)))
+        self.assertFalse(current.fields_equal(ExampleDeserializeConfig(name='name', int_field=4)))
+        self.assertTrue(ExampleDeserializeConfig.equal_to_current({'name': 'name', 'int_field': 3}))
+
+        # Only the hash of the new entry is computed, and compared to the one stored in the current entry.
+        with mock.patch.object(
+            ExampleDeserializeConfig, 'compute_content_hash', return_value=current.content_hash
+        ) as compute_content_hash:
+            self.assertTrue(ExampleDeserializeConfig.equal_to_current({'name': 'name', 'int_field': 4}))
+        compute_content_hash.assert_called_once_with()
+        self.assertFalse(current.fields_equal(ExampleDeserializeConfig(name='name', int_field=4), ('id',)))
+
+    @ddt.data(
+        (ExampleDeserializeConfig, {'name': 'name'}),
+        (ExampleConfig, {}),
+    )
+    @ddt.unpack
+    def test_modified_entry_saved(self, model, keys):
+        model(int_field=3, **keys).save()
+        model.current(*keys.values())
+
+        # Loaded with its stored hash, then changed in memory.
+        entry = model.objects.get()
+        entry.int_field = 99
+        self.assertFalse(model.objects.get().fields_equal(entry))
+        entry.save(skip_unchanged=True)
+        self.assertIsNotNone(entry.pk)
+        self.assertEqual(2, model.objects.count())
+        self.assertEqual(99, model.current(*keys.values()).int_field)
+
+    def test_fields_equal_ignores_hash_column(self):
+        ExampleDeserializeConfig(name='name', int_field=3).save()
+        current = ExampleDeserializeConfig.current('name')
+        fields_to_ignore = ('id', 'change_date', 'changed_by', 'enabled')
+        self.assertTrue(current.fields_equal(ExampleDeserializeConfig(name='name', int_field=3), fields_to_ignore))
+        self.assertFalse(current.fields_equal(ExampleDeserializeConfig(name='name', int_field=4), fields_to_ignore))
+        self.assertNotIn(
+            ExampleDeserializeConfig.content_hash_field(),
+            config_models_models.field_plan(ExampleDeserializeConfig).compared_fields,
+        )
+
+    @ddt.data(
+        (ExampleDeserializeConfig, {'name': 'name'}),
+        (ExampleConfig, {}),
+    )
+    @ddt.unpack
+    def test_skip_unchanged(self, model, keys):
+        model(int_field=3, changed_by=self.user, **keys).save()
+        model.current(*keys.values())
+
+        unchanged = model(int_field=3, **keys)
+        with mock.patch('config_models.models.invalidate') as mock_invalidate, self.assertNumQueries(0):
+            unchanged.save(skip_unchanged=True)
+        mock_invalidate.assert_not_called()
+        self.assertIsNone(unchanged.pk)
+        self.assertEqual(1, model.objects.count())
+
+        changed = model(int_field=4, **keys)
+        changed.save(skip_unchanged=True)
+        self.assertIsNotNone(changed.pk)
+        self.assertEqual(4, model.current(*keys.values()).int_field)
+
+
+class ScheduledConfigurationModelTests(CacheIsolationTestCase):
+    """
+    Tests of entries scheduled ahead of time with an ``EffectiveDateField``.
+    """
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            with freeze_time('2012-01-01'):
+                ExampleScheduledConfig(name='a', int_field=1).save()
+                ExampleScheduledConfig(name='b', int_field=1).save()
+            with freeze_time('2012-01-02'):
+                ExampleScheduledConfig(name='a', int_field=2, effective_date=datetime.datetime(2012, 1, 3)).save()
+
+    def current(self, name, when):
+        """
+        Return the current entry of `name` at `when`, read from the database.
+        """
+        TieredCache.dangerous_clear_all_tiers()
+        with freeze_time(when):
+            return ExampleScheduledConfig.current(name)
+
+    def test_current(self):
+        self.assertEqual(1, self.current('a', '2012-01-02 23:59:59').int_field)
+        self.assertEqual(2, self.current('a', '2012-01-03').int_field)
+        self.assertIsNone(ExampleConfig.effective_date_field())
+
+    def test_cache_timeout_aligned_to_activation(self):
+        with mock.patch.object(TieredCache, 'set_all_tiers') as set_all_tiers:
+            self.current('a', '2012-01-02 23:58:59.5')
+            self.current('a', '2012-01-02')
+            self.current('a', '2012-01-03')
+            self.current('b', '2012-01-02 23:58:59')
+        self.assertEqual([61, 300, 300, 300], [call.args[2] for call in set_all_tiers.call_args_list])
+
+    def test_cache_rolls_over(self):
+        with freeze_time('2012-01-02 23:59'):
+            self.assertEqual(1, ExampleScheduledConfig.current('a').int_field)
+        RequestCache.clear_all_namespaces()
+        with freeze_time('2012-01-02 23:59:59'):
+            with assert_config_budget(queries=0):
+                self.assertEqual(1, ExampleScheduledConfig.current('a').int_field)
+        RequestCache.clear_all_namespaces()
+        with freeze_time('2012-01-03'):
+            self.assertEqual(2, ExampleScheduledConfig.current('a').int_field)
+
+    def test_current_many(self):
+        with freeze_time('2012-01-02 23:59'):
+            with mock.patch.object(config_models_models.cache, 'set_many') as set_many:
+                entries = ExampleScheduledConfig.current_many([('a',), ('b',)])
+        self.assertEqual([1, 1], [entry.int_field for entry in entries])
+        set_many.assert_called_once_with(mock.ANY, 60)
+
+    def test_current_set(self):
+        def current_set(when):
+            with freeze_time(when):
+                return dict(ExampleScheduledConfig.objects.current_set().values_list('name', 'int_field'))
+
+        self.assertEqual({'a': 1, 'b': 1}, current_set('2012-01-02'))
+        self.assertEqual({'a': 2, 'b': 1}, current_set('2012-01-03'))
+
+        as_of = ExampleScheduledConfig.objects.current_set(as_of=datetime.datetime(2012, 1, 2, 12))
+        self.assertEqual({'a': 1, 'b': 1}, dict(as_of.values_list('name', 'int_field')))
+        self.assertEqual(1, ExampleScheduledConfig.as_of(datetime.datetime(2012, 1, 2, 12), 'a').int_field)
+        self.assertEqual(2, ExampleScheduledConfig.as_of(datetime.datetime(2012, 1, 3), 'a').int_field)
+
+    def test_saved_after_scheduled(self):
+        # Saved after the entry scheduled for 2012-01-03, but effective before it.
+        with freeze_time('2012-01-02 12:00'):
+            ExampleScheduledConfig(name='a', int_field=3).save()
+            ExampleScheduledConfig(name='b', int_field=3, effective_date=datetime.datetime(2012, 1, 2)).save()
+
+        def lookups(when):
+            TieredCache.dangerous_clear_all_tiers()
+            with freeze_time(when):
+                current_set = dict(ExampleScheduledConfig.objects.current_set().values_list('name', 'int_field'))
+                return (
+                    ExampleScheduledConfig.current('a').int_field,
+                    current_set['a'],
+                    ExampleScheduledConfig.current_from_db_many([('a',)])[0].int_field,
+                    ExampleScheduledConfig.as_of(timezone.now(), 'a').int_field,
+                )
+
+        self.assertEqual((3, 3, 3, 3), lookups('2012-01-02 13:00'))
+        # The scheduled entry takes effect after the others, so it is current from then on.
+        self.assertEqual((2, 2, 2, 2), lookups('2012-01-03'))
+        # An effective date in the past takes effect when the entry is saved.
+        with freeze_time('2012-01-03'):
+            self.assertEqual(3, ExampleScheduledConfig.current('b').int_field)
+
+    @override_settings(CONFIG_MODELS_WRITE_THROUGH=True)
+    def test_no_write_through(self):
+        with freeze_time('2012-01-02'):
+            with self.captureOnCommitCallbacks(execute=True):
+                ExampleScheduledConfig(name='b', int_field=3, effective_date=datetime.datetime(2012, 2, 1)).save()
+            self.assertIsNone(config_models_models.cache.get(ExampleScheduledConfig.cache_key_name('b')))
+            self.assertEqual(1, ExampleScheduledConfig.current('b').int_field)
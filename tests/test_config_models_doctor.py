@@ -0,0 +1,113 @@
+"""
+Tests of the config_models_doctor management command.
+"""
+import datetime
+import io
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from example.models import ExampleConfig, ExampleDeserializeConfig, ExampleKeyedConfig
+from freezegun import freeze_time
+
+from config_models.management.commands.config_models_doctor import configuration_models, diagnose, has_key_index
+from tests.utils import CacheIsolationTestCase
+
+User = get_user_model()
+
+
+class ConfigModelsDoctorTestCase(CacheIsolationTestCase):
+    """
+    Tests of the config_models_doctor management command.
+    """
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='test_doctor_user')
+        with freeze_time('2012-01-01', auto_tick_seconds=1), self.captureOnCommitCallbacks(execute=True):
+            for int_field in range(3):
+                ExampleKeyedConfig(left='left_a', right='right', user=self.user, int_field=int_field).save()
+            ExampleKeyedConfig(left='left_b', right='right', user=self.user).save()
+            ExampleConfig(enabled=True).save()
+            ExampleConfig(enabled=False).save()
+
+    def doctor(self, *args):
+        """
+        Run the command, returning its output lines.
+        """
+        stdout = io.StringIO()
+        call_command('config_models_doctor', *args, stdout=stdout)
+        return stdout.getvalue().splitlines()
+
+    def test_configuration_models(self):
+        self.assertIn(ExampleKeyedConfig, configuration_models())
+        self.assertNotIn(User, configuration_models())
+
+    def test_keyed_model(self):
+        report = diagnose(ExampleKeyedConfig)
+        self.assertEqual(
+            {'rows': 4, 'keys': 2, 'max_depth': 3, 'median_depth': 2, 'key_index': True, 'cached': '0/2'},
+            {key: report[key] for key in ('rows', 'keys', 'max_depth', 'median_depth', 'key_index', 'cached')},
+        )
+        self.assertGreater(report['payload_size'], 0)
+        self.assertIsNone(report['oldest_cached_change'])
+
+    @freeze_time('2012-01-02')
+    def test_cache_state(self):
+        cached = ExampleKeyedConfig.current('left_a', 'right', self.user)
+        report = diagnose(ExampleKeyedConfig)
+        self.assertEqual(('1/2', 0), (report['cached'], report['stale']))
+        self.assertEqual(datetime.datetime(2012, 1, 2) - cached.change_date, report['oldest_cached_change'])
+
+        # A stale value, e.g. left by a process which did not invalidate its cache.
+        ExampleKeyedConfig.objects.create(left='left_a', right='right', user=self.user, int_field=10)
+        self.assertEqual(1, diagnose(ExampleKeyedConfig)['stale'])
+
+    def test_sample(self):
+        self.assertEqual('0/1', diagnose(ExampleKeyedConfig, sample=1)['cached'])
+
+    def test_unkeyed_model(self):
+        ExampleConfig.current()
+        report = diagnose(ExampleConfig)
+        self.assertEqual(
+            {'rows': 2, 'keys': 1, 'max_depth': 2, 'median_depth': 2, 'key_index': None, 'cached': '1/1', 'stale': 0},
+            {key: report[key] for key in ('rows', 'keys', 'max_depth', 'median_depth', 'key_index', 'cached', 'stale')},
+        )
+
+    def test_empty_model(self):
+        report = diagnose(ExampleDeserializeConfig)
+        self.assertEqual(
+            (0, 0, None, None), (report['rows'], report['keys'], report['max_depth'], report['payload_size'])
+        )
+
+    def test_key_index(self):
+        self.assertTrue(has_key_index(ExampleDeserializeConfig))
+        self.assertTrue(has_key_index(ExampleKeyedConfig))
+        constraints = {
+            'name_date': {'columns': ['name', 'change_date'], 'index': True, 'unique': False},
+            'date': {'columns': ['change_date'], 'index': True, 'unique': False},
+        }
+        with patch.object(connection.introspection, 'get_constraints', return_value=constraints):
+            self.assertTrue(has_key_index(ExampleDeserializeConfig))
+            self.assertFalse(has_key_index(ExampleKeyedConfig))
+
+    def test_command(self):
+        lines = self.doctor()
+        self.assertTrue(lines[0].startswith('model'))
+        self.assertIn('key index', lines[0])
+        # Largest tables first.
+        self.assertEqual(['example.ExampleKeyedConfig', '4'], lines[1].split()[:2])
+        self.assertTrue(lines[2].startswith('example.ExampleConfig'))
+        self.assertEqual(len(configuration_models()) + 1, len(lines))
+
+    def test_command_models(self):
+        lines = self.doctor('example.ExampleConfig')
+        self.assertEqual(2, len(lines))
+        self.assertIn(' yes ', self.doctor('example.ExampleKeyedConfig')[1])
+        with patch.object(connection.introspection, 'get_constraints', return_value={}):
+            self.assertIn(' NO ', self.doctor('example.ExampleKeyedConfig')[1])
+
+    def test_command_not_configuration_model(self):
+        with self.assertRaisesRegex(CommandError, 'is not a ConfigurationModel'):
+            self.doctor('auth.Group')
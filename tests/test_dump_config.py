@@ -0,0 +1,105 @@
+"""
+Tests of the dump_config management command.
+"""
+
+
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from example.models import ExampleConfig, ExampleKeyedConfig, ManyToManyExampleConfig
+from freezegun import freeze_time
+
+from config_models.utils import deserialize_json
+from tests.utils import CacheIsolationTestCase
+
+User = get_user_model()
+
+
+class DumpConfigTestCase(CacheIsolationTestCase):
+    """
+    Tests of the dump_config management command.
+    """
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='test_dump_worker')
+        with freeze_time('2012-01-01'):
+            ExampleKeyedConfig(left='left_a', right='right_a', user=self.user, string_field='first_a').save()
+            ExampleKeyedConfig(left='left_b', right='right_b', user=self.user, string_field='first_b').save()
+        ExampleKeyedConfig(left='left_a', right='right_a', user=self.user, string_field='second_a').save()
+
+    def dump(self, *args, **kwargs):
+        """
+        Run the command, returning its output.
+        """
+        stdout = io.StringIO()
+        call_command('dump_config', *args, stdout=stdout, **kwargs)
+        return stdout.getvalue()
+
+    def test_dump_current_set(self):
+        dumped = json.loads(self.dump('example.ExampleKeyedConfig'))
+        self.assertEqual('example.ExampleKeyedConfig', dumped['model'])
+        self.assertEqual(
+            [
+                {'enabled': False, 'left': 'left_b', 'right': 'right_b', 'user': self.user.id,
+                 'string_field': 'first_b', 'int_field': 10},
+                {'enabled': False, 'left': 'left_a', 'right': 'right_a', 'user': self.user.id,
+                 'string_field': 'second_a', 'int_field': 10},
+            ],
+            dumped['data'],
+        )
+
+    def test_dump_history(self):
+        dumped = json.loads(self.dump('example.ExampleKeyedConfig', history=True))
+        self.assertEqual(
+            ['first_a', 'first_b', 'second_a'],
+            [row['string_field'] for row in dumped['data']],
+        )
+
+    def test_dump_unkeyed_and_many_to_many(self):
+        ExampleConfig(string_field='first').save()
+        ExampleConfig(string_field='second').save()
+        many = ManyToManyExampleConfig(string_field='many')
+        many.save()
+        many.many_user_field.add(self.user)
+
+        dumped = json.loads(self.dump('example.ExampleConfig', 'example.ManyToManyExampleConfig', chunk_size=1))
+        self.assertEqual(
+            [
+                {'model': 'example.ExampleConfig',
+                 'data': [{'enabled': False, 'string_field': 'second', 'int_field': 10}]},
+                {'model': 'example.ManyToManyExampleConfig',
+                 'data': [{'enabled': False, 'string_field': 'many', 'many_user_field': [self.user.id]}]},
+            ],
+            dumped['models'],
+        )
+
+    def test_dump_empty_model(self):
+        dumped = json.loads(self.dump('example.ExampleConfig'))
+        self.assertEqual({'model': 'example.ExampleConfig', 'data': []}, dumped)
+
+    def test_dump_ndjson(self):
+        lines = self.dump('example.ExampleKeyedConfig', format='ndjson').splitlines()
+        self.assertEqual(2, len(lines))
+        self.assertEqual(
+            ['first_b', 'second_a'],
+            [json.loads(line)['data'][0]['string_field'] for line in lines],
+        )
+
+    def test_round_trip(self):
+        """
+        Importing an export of the current set creates no new entries.
+        """
+        dumped = self.dump('example.ExampleKeyedConfig')
+        self.assertEqual(0, deserialize_json(io.BytesIO(dumped.encode('utf-8')), self.user.username))
+        self.assertEqual(3, ExampleKeyedConfig.objects.count())
+
+    def test_not_a_configuration_model(self):
+        with self.assertRaisesRegex(CommandError, "is not a ConfigurationModel"):
+            self.dump('auth.Group')
+
+    def test_unknown_model(self):
+        with self.assertRaisesRegex(CommandError, "No installed app"):
+            self.dump('xxx.yyy')
@@ -0,0 +1,149 @@
+"""
+Tests of the cache invalidation of configuration models.
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import override_settings
+from edx_django_utils.cache.utils import RequestCache
+from example.models import ExampleConfig, ExampleKeyedConfig
+
+from config_models import invalidation
+
+from .utils import CacheIsolationTestCase
+
+User = get_user_model()
+
+
+class InvalidationTests(CacheIsolationTestCase):
+    """
+    Tests of config_models.invalidation.
+    """
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='test_invalidation_user')
+
+    def test_affected_cache_keys(self):
+        entry = ExampleKeyedConfig(left='left', right='right', user=self.user)
+        self.assertEqual(
+            {
+                f'configuration/ExampleKeyedConfig/current/left,right,{self.user.pk}',
+                'configuration/ExampleKeyedConfig/key_values/left,right,user',
+            },
+            invalidation.affected_cache_keys(ExampleKeyedConfig, [entry]),
+        )
+        self.assertEqual(
+            {'configuration/ExampleConfig/current'},
+            invalidation.affected_cache_keys(ExampleConfig, [ExampleConfig(), ExampleConfig()]),
+        )
+
+    def test_save_deletes_once(self):
+        with mock.patch.object(invalidation.cache, 'delete_many') as mock_delete_many:
+            with self.captureOnCommitCallbacks(execute=True):
+                ExampleKeyedConfig(left='left', right='right', user=self.user).save()
+        mock_delete_many.assert_called_once()
+        self.assertEqual(2, len(mock_delete_many.call_args[0][0]))
+
+    def test_save_clears_current(self):
+        self.assertFalse(ExampleKeyedConfig.current('left', 'right', self.user).enabled)
+        ExampleKeyedConfig(left='left', right='right', user=self.user, enabled=True).save()
+        self.assertTrue(ExampleKeyedConfig.current('left', 'right', self.user).enabled)
+
+    def test_batched_invalidation(self):
+        with mock.patch.object(invalidation.cache, 'delete_many') as mock_delete_many, \
+                self.captureOnCommitCallbacks(execute=True):
+            with invalidation.batched_invalidation():
+                ExampleKeyedConfig(left='left', right='right', user=self.user).save()
+                with invalidation.batched_invalidation():
+                    ExampleKeyedConfig(left='other', right='right', user=self.user).save()
+                ExampleConfig().save()
+                mock_delete_many.assert_not_called()
+        mock_delete_many.assert_called_once()
+        self.assertEqual(4, len(mock_delete_many.call_args[0][0]))
+
+    def test_batched_request_cache(self):
+        self.assertFalse(ExampleConfig.current().enabled)
+        with invalidation.batched_invalidation():
+            ExampleConfig(enabled=True).save()
+            # The request cache is cleared right away, so the process reads its own writes.
+            self.assertTrue(ExampleConfig.current().enabled)
+        self.assertTrue(ExampleConfig.current().enabled)
+
+    def test_delete_on_commit(self):
+        ExampleConfig.current()
+        with mock.patch.object(invalidation.cache, 'delete_many') as mock_delete_many:
+            with self.captureOnCommitCallbacks() as callbacks:
+                ExampleConfig(enabled=True).save()
+                # Until the commit, the django cache is left alone, and ignored by this process.
+                mock_delete_many.assert_not_called()
+                self.assertTrue(invalidation.is_pending(ExampleConfig.cache_key_name()))
+                self.assertTrue(ExampleConfig.current().enabled)
+            self.assertEqual(1, len(callbacks))
+            callbacks[0]()
+        mock_delete_many.assert_called_once_with([ExampleConfig.cache_key_name()])
+        self.assertFalse(invalidation.is_pending(ExampleConfig.cache_key_name()))
+
+    def test_rolled_back_save(self):
+        ExampleConfig.current()
+        with self.captureOnCommitCallbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    ExampleConfig(enabled=True).save()
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertEqual([], callbacks)
+        self.assertFalse(invalidation.is_pending(ExampleConfig.cache_key_name()))
+        with self.assertNumQueries(0):
+            self.assertFalse(ExampleConfig.current().enabled)
+
+    @override_settings(CONFIG_MODELS_WRITE_THROUGH=True)
+    def test_write_through(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ExampleKeyedConfig(left='left', right='right', user=self.user, int_field=5).save()
+        cached = invalidation.cache.get(ExampleKeyedConfig.current_cache_key('left', 'right', self.user))
+        self.assertEqual(5, cached.int_field)
+        self.assertEqual({}, cached._state.fields_cache)  # pylint: disable=protected-access
+        self.assertIsNone(invalidation.cache.get(ExampleKeyedConfig.key_values_cache_key_name()))
+
+        RequestCache.clear_all_namespaces()
+        with self.assertNumQueries(0):
+            self.assertEqual(5, ExampleKeyedConfig.current('left', 'right', self.user).int_field)
+
+    def test_read_before_rollback(self):
+        ExampleConfig.current()
+        ExampleKeyedConfig.current('left', 'right', self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    ExampleConfig(enabled=True).save()
+                    ExampleKeyedConfig(left='left', right='right', user=self.user, int_field=5).save()
+                    # Reads inside the transaction see the uncommitted entries...
+                    self.assertTrue(ExampleConfig.current().enabled)
+                    current_entries = ExampleKeyedConfig.current_many([('left', 'right', self.user)])
+                    self.assertEqual([5], [entry.int_field for entry in current_entries])
+                    raise ValueError
+            except ValueError:
+                pass
+        # ...but only cache them for the request, not in the django cache.
+        self.assertFalse(invalidation.cache.get(ExampleConfig.cache_key_name()).enabled)
+        self.assertEqual(
+            10, invalidation.cache.get(ExampleKeyedConfig.current_cache_key('left', 'right', self.user)).int_field
+        )
+        RequestCache.clear_all_namespaces()
+        self.assertFalse(ExampleConfig.current().enabled)
+
+    @override_settings(CONFIG_MODELS_WRITE_THROUGH=True)
+    def test_write_through_rolled_back(self):
+        ExampleKeyedConfig.current('left', 'right', self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with invalidation.batched_invalidation(), transaction.atomic():
+                    ExampleKeyedConfig(left='left', right='right', user=self.user, int_field=5).save()
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertIsNone(invalidation.cache.get(ExampleKeyedConfig.current_cache_key('left', 'right', self.user)))
+        RequestCache.clear_all_namespaces()
+        self.assertEqual(10, ExampleKeyedConfig.current('left', 'right', self.user).int_field)
@@ -0,0 +1,72 @@
+"""
+Tests of the metrics of configuration lookups.
+"""
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from edx_django_utils.cache.utils import RequestCache
+from example.models import ExampleConfig, ExampleKeyedConfig
+
+from config_models import metrics
+from config_models.models import current_configurations
+
+from .utils import CacheIsolationTestCase
+
+User = get_user_model()
+
+
+@override_settings(CONFIG_MODELS_METRICS_BACKEND='config_models.metrics.InMemoryMetricsBackend')
+class MetricsTests(CacheIsolationTestCase):
+    """
+    Tests of the metrics recorded by ConfigurationModel lookups and writes.
+    """
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='test_metrics_user')
+        self.backend = metrics.get_metrics_backend()
+        self.backend.reset()
+
+    def test_current_tiers(self):
+        ExampleConfig.current()
+        ExampleConfig.current()
+        RequestCache.clear_all_namespaces()
+        ExampleConfig.current()
+
+        model = 'example.ExampleConfig'
+        self.assertEqual(1, self.backend.count(metrics.CACHE_MISS, model=model, lookup='current'))
+        self.assertEqual(1, self.backend.count(metrics.CACHE_HIT, model=model, tier='request'))
+        self.assertEqual(1, self.backend.count(metrics.CACHE_HIT, model=model, tier='django'))
+        self.assertEqual(1, len(self.backend.values(metrics.DB_FALLBACK, model=model)))
+        sizes = self.backend.values(metrics.PAYLOAD_SIZE, model=model)
+        self.assertEqual(1, len(sizes))
+        self.assertGreater(sizes[0], 0)
+
+    def test_key_values(self):
+        ExampleKeyedConfig.key_values()
+        ExampleKeyedConfig.key_values()
+        model = 'example.ExampleKeyedConfig'
+        self.assertEqual(1, self.backend.count(metrics.CACHE_MISS, model=model, lookup='key_values'))
+        self.assertEqual(1, self.backend.count(metrics.CACHE_HIT, model=model, lookup='key_values'))
+
+    def test_invalidation(self):
+        ExampleKeyedConfig(left='left', right='right', user=self.user).save()
+        ExampleConfig().save()
+        self.assertEqual(2, self.backend.count(metrics.INVALIDATION, model='example.ExampleKeyedConfig'))
+        self.assertEqual(1, self.backend.count(metrics.INVALIDATION, model='example.ExampleConfig'))
+        self.assertEqual(3, self.backend.count(metrics.INVALIDATION))
+
+    def test_current_configurations(self):
+        ExampleConfig.current()
+        current_configurations([
+            (ExampleConfig, [()]),
+            (ExampleKeyedConfig, [('left', 'right', self.user), ('other', 'right', self.user)]),
+        ])
+        lookup = 'current_configurations'
+        self.assertEqual(1, self.backend.count(metrics.CACHE_HIT, model='example.ExampleConfig', lookup=lookup))
+        self.assertEqual(2, self.backend.count(metrics.CACHE_MISS, model='example.ExampleKeyedConfig', lookup=lookup))
+        self.assertEqual(2, len(self.backend.values(metrics.PAYLOAD_SIZE, lookup=lookup)))
+
+    def test_disabled(self):
+        with override_settings(CONFIG_MODELS_METRICS_BACKEND=None):
+            self.assertIsNone(metrics.get_metrics_backend())
+            ExampleConfig.current()
+        self.assertEqual(0, self.backend.count(metrics.CACHE_MISS))
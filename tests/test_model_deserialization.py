@@ -4,17 +4,25 @@ Tests of the populate_model management command and its helper utils.deserialize_
 
 
 import io
+import multiprocessing
 import os.path
 import textwrap
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.core.management.base import CommandError
+from django.test import TransactionTestCase
 from django.utils import timezone
-from example.models import ExampleDeserializeConfig
+from example.models import ExampleConfig, ExampleDeserializeConfig
 
 from config_models.management.commands import populate_model
+from config_models.parsing import load_config_file
+from config_models.testing import assert_config_budget
 from config_models.utils import deserialize_json
-from tests.utils import CacheIsolationTestCase
+from tests.utils import CacheIsolationMixin, CacheIsolationTestCase
 
 User = get_user_model()
 
@@ -107,6 +115,16 @@ class DeserializeJSONTests(CacheIsolationTestCase):
         self.assertEqual(4, ExampleDeserializeConfig.objects.count())
         self.assertEqual(5, ExampleDeserializeConfig.current('betty').int_field)
 
+    def test_budget(self):
+        """
+        Per entry, importing looks up its current value (a cache get, a query and a cache set),
+        then loads the user and inserts the entry. The cache is invalidated once, after the commit.
+        """
+        with assert_config_budget(queries=8, cache_gets=2, cache_sets=2, cache_deletes=1):
+            with self.captureOnCommitCallbacks(execute=True):
+                with open(self.fixture_path, "rb") as data:
+                    deserialize_json(data, self.test_username)
+
     def test_bad_username(self):
         """
         Tests the error handling when the specified user does not exist.
@@ -145,6 +163,43 @@ class DeserializeJSONTests(CacheIsolationTestCase):
         with self.assertRaisesRegex(Exception, "No installed app"):
             deserialize_json(io.BytesIO(test_json), self.test_username)
 
+    def test_deserialize_manifest(self):
+        """
+        A manifest carrying several model blocks creates entries for each of the models.
+        """
+        manifest_path = os.path.join(os.path.dirname(__file__), 'data', 'manifest', 'manifest.json')
+        with open(manifest_path, "rb") as data:
+            entries_created = deserialize_json(data, self.test_username)
+            self.assertEqual(2, entries_created)
+
+        self.assertTrue(ExampleDeserializeConfig.current('wilma').enabled)
+        self.assertEqual('bedrock', ExampleConfig.current().string_field)
+        self.assertEqual(3, ExampleConfig.current().int_field)
+
+    def test_invalid_manifest(self):
+        """
+        Tests the error handling when a block of the manifest has no data list.
+        """
+        test_json = textwrap.dedent("""
+            {
+                "models": [{"model": "example.ExampleDeserializeConfig"}]
+            }
+            """).encode('utf-8')
+        with self.assertRaisesRegex(ValueError, "'model' label and a 'data' list"):
+            deserialize_json(io.BytesIO(test_json), self.test_username)
+
+    def test_invalid_document(self):
+        """
+        Tests the error handling when the document or its manifest has the wrong structure.
+        """
+        for test_json, message in (
+            (b'[]', "must be an object"),
+            (b'{"models": {}}', "must be a list"),
+            (b'{"models": [[]]}', "'model' label and a 'data' list"),
+        ):
+            with self.assertRaisesRegex(ValueError, message):
+                deserialize_json(io.BytesIO(test_json), self.test_username)
+
 
 class PopulateModelTestCase(CacheIsolationTestCase):
     """
@@ -153,6 +208,7 @@ class PopulateModelTestCase(CacheIsolationTestCase):
     def setUp(self):
         super().setUp()
         self.file_path = os.path.join(os.path.dirname(__file__), 'data', 'data.json')
+        self.manifest_path = os.path.join(os.path.dirname(__file__), 'data', 'manifest', 'manifest.json')
         self.test_username = 'test_management_worker'
         User.objects.create_user(username=self.test_username)
 
@@ -198,6 +254,136 @@ class PopulateModelTestCase(CacheIsolationTestCase):
         with self.assertRaisesRegex(CommandError, "File does/not/exist.json does not exist"):
             _run_command(file="does/not/exist.json", username=self.test_username)
 
+    def test_run_command_directory(self):
+        """
+        Tests importing every JSON file of a directory, including a manifest of several models.
+        """
+        _run_command(paths=[os.path.dirname(self.manifest_path)], username=self.test_username)
+        self.assertEqual(3, ExampleDeserializeConfig.objects.count())
+        self.assertEqual(1, ExampleConfig.objects.count())
+        self.assertEqual(self.test_username, ExampleConfig.current().changed_by.username)
+
+    def test_run_command_multiple_files_with_workers(self):
+        """
+        Tests parsing several files in a process pool; entries of the same model are still written in file order.
+        """
+        more_data_path = os.path.join(os.path.dirname(__file__), 'data', 'more_data.json')
+        _run_command(file=[self.file_path, more_data_path], username=self.test_username, workers=2)
+        self.assertEqual(4, ExampleDeserializeConfig.objects.count())
+        self.assertTrue(ExampleDeserializeConfig.current('wilma').enabled)
+        self.assertFalse(ExampleDeserializeConfig.current('betty').enabled)
+
+    def test_unchanged_file_skipped(self):
+        """
+        Re-importing an unchanged file skips it without parsing, until its model gains entries.
+        """
+        _run_command(file=self.file_path, username=self.test_username)
+        self.assertEqual(2, ExampleDeserializeConfig.objects.count())
+
+        with patch.object(populate_model, 'load_config_file') as mock_load:
+            _run_command(file=self.file_path, username=self.test_username)
+            mock_load.assert_not_called()
+
+        # A change to the model since the last import makes the file importable again.
+        ExampleDeserializeConfig(name="betty", int_field=-8).save()
+        _run_command(file=self.file_path, username=self.test_username)
+        self.assertEqual(4, ExampleDeserializeConfig.objects.count())
+        self.assertEqual(5, ExampleDeserializeConfig.current('betty').int_field)
+
+    def test_parse_files_spawn(self):
+        """
+        Files can be parsed by worker processes started with spawn, in which Django isn't set up.
+        """
+        spawn_executor = partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context('spawn'))
+        with patch.object(populate_model, 'ProcessPoolExecutor', spawn_executor):
+            # pylint: disable=protected-access
+            parsed_files = populate_model.Command()._parse_files([self.file_path, self.file_path], 2)
+        self.assertEqual([load_config_file(self.file_path)] * 2, parsed_files)
+
+    def test_force_unchanged_file(self):
+        """
+        Tests that --force parses a file even when it was already imported.
+        """
+        _run_command(file=self.file_path, username=self.test_username)
+        with patch.object(populate_model, 'load_config_file', wraps=populate_model.load_config_file) as mock_load:
+            _run_command(file=self.file_path, username=self.test_username, force=True)
+            mock_load.assert_called_once_with(self.file_path)
+        self.assertEqual(2, ExampleDeserializeConfig.objects.count())
+
+
+class PopulateModelWorkersTestCase(CacheIsolationMixin, TransactionTestCase):
+    """
+    Tests of the concurrent writes of populate_model, whose worker threads use their own database
+    connections, so the data must be committed.
+    """
+    def setUp(self):
+        super().setUp()
+        self.clear_caches()
+        self.addCleanup(self.clear_caches)
+        self.test_username = 'test_workers'
+        User.objects.create_user(username=self.test_username)
+        self.manifest_path = os.path.join(os.path.dirname(__file__), 'data', 'manifest', 'manifest.json')
+        self.writes = []
+        lock = threading.Lock()
+        write_block = populate_model.deserialize_config_block
+
+        def serialized_write(block, username):
+            # SQLite does not allow concurrent writes to the in-memory test database.
+            with lock:
+                self.writes.append((block["model"], threading.get_ident()))
+                return write_block(block, username)
+
+        patcher = patch.object(populate_model, 'deserialize_config_block', side_effect=serialized_write)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_independent_models(self):
+        """
+        Independent models are written by worker threads, which close their database connections.
+        """
+        close_all = populate_model.connections.close_all
+        with patch.object(populate_model.connections, 'close_all', wraps=close_all) as close:
+            _run_command(paths=[self.manifest_path], username=self.test_username, workers=2)
+
+        self.assertEqual(
+            {'example.ExampleDeserializeConfig', 'example.ExampleConfig'}, {label for label, _thread in self.writes}
+        )
+        self.assertNotIn(threading.get_ident(), {thread for _label, thread in self.writes})
+        self.assertEqual(2, close.call_count)
+        self.assertTrue(ExampleDeserializeConfig.current('wilma').enabled)
+        self.assertEqual(3, ExampleConfig.current().int_field)
+
+    def test_related_models(self):
+        """
+        Models related to each other are written in order by the same thread, in parallel with the others.
+        """
+        # The example models are only related to users, so related models of the auth app stand in.
+        blocks_by_model = {
+            'auth.Group': [{'model': 'auth.Group', 'data': []}],
+            'example.ExampleConfig': [{'model': 'example.ExampleConfig', 'data': []}],
+            'auth.Permission': [{'model': 'auth.Permission', 'data': []}],
+        }
+        self.assertEqual(
+            [['auth.Group', 'auth.Permission'], ['example.ExampleConfig']],
+            populate_model._group_dependent_models(blocks_by_model),  # pylint: disable=protected-access
+        )
+
+        written = []
+
+        def write_block(block, _username):
+            written.append((block['model'], threading.get_ident()))
+            return 1
+
+        with patch.object(populate_model, 'deserialize_config_block', side_effect=write_block):
+            command = populate_model.Command()
+            created = command._write_blocks(blocks_by_model, self.test_username, 2)  # pylint: disable=protected-access
+        self.assertEqual(3, created)
+        labels = [label for label, _thread in written]
+        self.assertLess(labels.index('auth.Group'), labels.index('auth.Permission'))
+        threads = dict(written)
+        self.assertEqual(threads['auth.Group'], threads['auth.Permission'])
+        self.assertNotIn(threading.get_ident(), threads.values())
+
 
 def _run_command(*args, **kwargs):
     """Run the management command to deserializer JSON ConfigurationModel data. """
@@ -0,0 +1,54 @@
+"""
+Tests of the query and cache operation budgets of the configuration lookups and saves.
+"""
+from django.contrib.auth import get_user_model
+from edx_django_utils.cache.utils import RequestCache
+from example.models import ExampleConfig, ExampleKeyedConfig
+
+from config_models.testing import assert_config_budget
+
+from .utils import CacheIsolationTestCase
+
+User = get_user_model()
+
+
+class ConfigBudgetTests(CacheIsolationTestCase):
+    """
+    Tests of assert_config_budget, pinning the costs of current() and save().
+    """
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='test_budget_user')
+
+    def test_current_miss(self):
+        # The lookup of the django cache, the query of the current row, and the cache fill.
+        with assert_config_budget(queries=1, cache_gets=1, cache_sets=1, cache_deletes=0):
+            ExampleConfig.current()
+
+    def test_current_django_cache_hit(self):
+        ExampleConfig.current()
+        RequestCache.clear_all_namespaces()
+        with assert_config_budget(queries=0, cache_gets=1, cache_sets=0):
+            ExampleConfig.current()
+
+    def test_current_request_cache_hit(self):
+        ExampleConfig.current()
+        with assert_config_budget(queries=0, cache_gets=0, cache_sets=0):
+            ExampleConfig.current()
+
+    def test_keyed_current_miss(self):
+        with assert_config_budget(queries=1, cache_gets=1, cache_sets=1):
+            ExampleKeyedConfig.current('left', 'right', self.user)
+
+    def test_save(self):
+        ExampleConfig.current()
+        # The insert, and the invalidation of the django cache once committed.
+        with assert_config_budget(queries=1, cache_gets=0, cache_sets=0, cache_deletes=1) as budget:
+            with self.captureOnCommitCallbacks(execute=True):
+                ExampleConfig(enabled=True, changed_by=self.user).save()
+        self.assertIn('INSERT', budget.captured_queries[0])
+
+    def test_budget_not_matched(self):
+        with self.assertRaisesRegex(AssertionError, 'queries: 1 made, 0 expected; cache_sets: 1 made, 2 expected'):
+            with assert_config_budget(queries=0, cache_sets=2):
+                ExampleConfig.current()
@@ -0,0 +1,116 @@
+"""
+Tests of the tracing spans and of the slow-lookup log.
+"""
+import io
+import json
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from example.models import ExampleConfig, ExampleKeyedConfig
+
+from config_models.utils import deserialize_json
+
+from .utils import CacheIsolationTestCase
+
+User = get_user_model()
+
+SPANS = []
+
+
+class FakeSpan:
+    """
+    Span recording its name and attributes.
+    """
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = dict(attributes)
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+
+class FakeTracer:
+    """
+    Tracer with the interface of the OpenTelemetry tracers, recording its spans in SPANS.
+    """
+    @contextmanager
+    def start_as_current_span(self, name, attributes=None):
+        span = FakeSpan(name, attributes or {})
+        SPANS.append(span)
+        yield span
+
+
+def fake_tracer():
+    return FakeTracer()
+
+
+class TracingTests(CacheIsolationTestCase):
+    """
+    Tests of config_models.tracing.
+    """
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='test_tracing_user')
+        SPANS.clear()
+
+    @override_settings(CONFIG_MODELS_TRACER='tests.test_tracing.fake_tracer')
+    def test_spans(self):
+        ExampleConfig.current()
+        ExampleConfig.current()
+        ExampleKeyedConfig.key_values('left')
+        # The span of current_set() covers the evaluation of the queryset, not building it.
+        current_set = ExampleKeyedConfig.objects.current_set().filter(left='left')
+        self.assertEqual(3, len(SPANS))
+        list(current_set)
+
+        self.assertEqual(
+            [
+                ('config_models.current', 'database'),
+                ('config_models.current', 'request'),
+                ('config_models.key_values', 'database'),
+                ('config_models.current_set', 'database'),
+            ],
+            [(span.name, span.attributes['config_models.tier']) for span in SPANS],
+        )
+        self.assertEqual('example.ExampleConfig', SPANS[0].attributes['config_models.model'])
+        self.assertEqual("('left',)", SPANS[2].attributes['config_models.keys'])
+
+    @override_settings(CONFIG_MODELS_TRACER='tests.test_tracing.fake_tracer')
+    def test_deserialize_spans(self):
+        data = {'model': 'example.ExampleDeserializeConfig', 'data': [{'name': 'a'}]}
+        deserialize_json(io.BytesIO(json.dumps(data).encode()), self.user.username)
+        self.assertEqual(
+            ['config_models.deserialize_json', 'config_models.deserialize_config_block'],
+            [span.name for span in SPANS if span.name.startswith('config_models.deserialize')],
+        )
+
+    def test_no_tracer(self):
+        ExampleConfig.current()
+        self.assertEqual([], SPANS)
+
+    @override_settings(CONFIG_MODELS_SLOW_LOOKUP_SECONDS=0, CONFIG_MODELS_SLOW_LOOKUP_STACK_DEPTH=3)
+    def test_slow_lookup_log(self):
+        with self.assertLogs('config_models.slow_lookups', 'WARNING') as logs:
+            ExampleKeyedConfig.current('left', 'right', self.user)
+        self.assertEqual(1, len(logs.output))
+        message = logs.output[0]
+        self.assertIn("current of example.ExampleKeyedConfig for keys ('left', 'right', ", message)
+        self.assertIn('served by the database', message)
+        self.assertIn('test_slow_lookup_log', message)
+        self.assertEqual(3, message.count('File "'))
+
+    @override_settings(CONFIG_MODELS_SLOW_LOOKUP_SECONDS=60)
+    def test_fast_lookup_not_logged(self):
+        with self.assertNoLogs('config_models.slow_lookups'):
+            ExampleConfig.current()
+
+    @override_settings(CONFIG_MODELS_SLOW_LOOKUP_SECONDS=0)
+    def test_slow_current_set_logged(self):
+        with self.assertNoLogs('config_models.slow_lookups'):
+            current_set = ExampleKeyedConfig.objects.current_set()
+        with self.assertLogs('config_models.slow_lookups', 'WARNING') as logs:
+            self.assertEqual([], list(current_set.iterator()))
+        self.assertEqual(1, len(logs.output))
+        self.assertIn('current_set of example.ExampleKeyedConfig', logs.output[0])
+        self.assertIn('served by the database', logs.output[0])
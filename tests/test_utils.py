@@ -0,0 +1,49 @@
+"""
+Tests of the serializer helpers in config_models.utils.
+"""
+
+
+from django.contrib.auth import get_user_model
+from example.models import ExampleConfig, ExampleKeyedConfig, ManyToManyExampleConfig
+
+from config_models.utils import get_read_serializer, get_serializer_class
+from tests.utils import CacheIsolationTestCase
+
+User = get_user_model()
+
+
+class SerializerTests(CacheIsolationTestCase):
+    """
+    Tests of get_serializer_class and the lightweight read serializer.
+    """
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='test_serializer_user')
+
+    def test_serializer_class_memoized(self):
+        self.assertIs(get_serializer_class(ExampleConfig), get_serializer_class(ExampleConfig))
+        self.assertIsNot(get_serializer_class(ExampleConfig), get_serializer_class(ExampleKeyedConfig))
+        self.assertIs(get_read_serializer(ExampleConfig), get_read_serializer(ExampleConfig))
+
+    def assert_same_representation(self, instance):
+        """
+        Assert that the read serializer matches the full DRF serializer for `instance`.
+        """
+        expected = dict(get_serializer_class(type(instance))(instance).data)
+        self.assertEqual(expected, get_read_serializer(type(instance)).to_representation(instance))
+
+    def test_unsaved_instance(self):
+        self.assert_same_representation(ExampleConfig.current())
+        self.assert_same_representation(ManyToManyExampleConfig.current())
+
+    def test_saved_instances(self):
+        ExampleConfig(string_field='first', int_field=3, changed_by=self.user).save()
+        self.assert_same_representation(ExampleConfig.current())
+
+        ExampleKeyedConfig(left='left', right='right', user=self.user, string_field='keyed').save()
+        self.assert_same_representation(ExampleKeyedConfig.current('left', 'right', self.user.id))
+
+        config = ManyToManyExampleConfig(string_field='many')
+        config.save()
+        config.many_user_field.add(self.user)
+        self.assert_same_representation(ManyToManyExampleConfig.objects.get(pk=config.pk))